@@ -1,132 +1,186 @@
-from math import sqrt
+import os
 import torch
 import random
 import numpy as np
-from collections import deque, List
-from pacman.pacman import Direction, PacmanGameAI
+from inference import epsilon_greedy
+from model import Linear_QNet, QTrainer
+from pacman.pacman import PacmanGameAI
+from pacman.profiling import Profiler, profile_agent, profile_game
+from pacman.recording import EpisodeWriter
+from pacman.state import StateEncoder, STATE_SIZE
+from replay import ReplayBuffer
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
 LR = 0.001
+HIDDEN_SIZE = 256
+# The network is small, more threads than this only add sync overhead. Set by
+# the training entry points, never by Agent, so rollout workers keep their one.
+NUM_THREADS = min(4, os.cpu_count() or 1)
 
 class Agent:
     def __init__(self):
         self.n_games = 0
         self.epsilon = 0
         self.gamma = 0.9 # Discount rate
-        self.memory = deque(maxlen=MAX_MEMORY)
-        self.model = None
-        self.trainer = None
+        self.memory = ReplayBuffer(MAX_MEMORY, STATE_SIZE, BATCH_SIZE)
+        self.model = Linear_QNet(STATE_SIZE, HIDDEN_SIZE, 4)
+        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
+        self.encoder = StateEncoder()
+        self.rng = np.random.default_rng()
 
     def get_state(self, game: PacmanGameAI):
-        pacman_position = [game.pacman.rect.left, game.pacman.rect.top]
-        blinky_position = [game.blinky.rect.left, game.blinky.rect.top]
-        pinky_position = [game.pinky.rect.left, game.pinky.rect.top]
-        inky_position = [game.inky.rect.left, game.inky.rect.top]
-        clyde_position = [game.clyde.rect.left, game.clyde.rect.top]
-
-        valid_directions = game.pacman.get_valid_directions(game.wall_list, game.gate)
-        valid_directions_mask = game.pacman.get_valid_directions_mask(valid_directions)
-
-        pacman_blinky_euc_dist = sqrt((pacman_position[0]-blinky_position[0])**2 + (pacman_position[1] - blinky_position[1])**2)
-        pacman_pinky_euc_dist = sqrt((pacman_position[0]-pinky_position[0])**2 + (pacman_position[1] - pinky_position[1])**2)
-        pacman_inky_euc_dist = sqrt((pacman_position[0]-inky_position[0])**2 + (pacman_position[1] - inky_position[1])**2)
-        pacman_clyde_euc_dist = sqrt((pacman_position[0]-clyde_position[0])**2 + (pacman_position[1] - clyde_position[1])**2)
-        
-        safety_score_list = [0., 0., 0., 0.]
-        for index, direction in enumerate(valid_directions_mask):
-
-            if direction == 0:
-                continue
-
-            pacman_new_position = [pacman_position[0], pacman_position[1]]
-            if index == 0:
-                pacman_new_position[0] += 30
-            elif index == 1:
-                pacman_new_position[0] -= 30
-            elif index == 2:
-                pacman_new_position[1] -= 30
-            else:
-                pacman_new_position[1] += 30
-
-            pacman_blinky_euc_dist_new = sqrt((pacman_new_position[0]-blinky_position[0])**2 + (pacman_new_position[1] - blinky_position[1])**2)
-            pacman_pinky_euc_dist_new = sqrt((pacman_new_position[0]-pinky_position[0])**2 + (pacman_new_position[1] - pinky_position[1])**2)
-            pacman_inky_euc_dist_new = sqrt((pacman_new_position[0]-inky_position[0])**2 + (pacman_new_position[1] - inky_position[1])**2)
-            pacman_clyde_euc_dist_new = sqrt((pacman_new_position[0]-clyde_position[0])**2 + (pacman_new_position[1] - clyde_position[1])**2)
-
-            safety_score_blinky = pacman_blinky_euc_dist_new - pacman_blinky_euc_dist
-            safety_score_pinky = pacman_pinky_euc_dist_new - pacman_pinky_euc_dist
-            safety_score_inky = pacman_inky_euc_dist_new - pacman_inky_euc_dist
-            safety_score_clyde = pacman_clyde_euc_dist_new - pacman_clyde_euc_dist
-            
-            safety_score = (min(safety_score_blinky, safety_score_pinky, safety_score_inky, safety_score_clyde) + 30) /60
-
-            safety_score_list[index] = safety_score
-
-        food_grid = self.get_food_grid(pacman_position, game.block_list)
-        flattened_food_grid = [cell for row in food_grid for cell in row]
-
-        state = valid_directions_mask + safety_score_list + flattened_food_grid
-
-        return state
-
-    def get_food_grid(self, pacman_pos, block_list) -> List[[]]:
-        grid = [[0 for _ in range(5)] for _ in range(5)]
-        px, py = pacman_pos
-
-        for block in block_list:
-            bx, by = block.rect.x, block.rect.y
-            grid_x = (bx - px) // 30 + 2
-            grid_y =(by - py) // 30 + 2
-
-            if 0 <= grid_x < 5 and 0 <= grid_y < 5:
-                grid[grid_y][grid_x] = 1
-
-        return grid
-
+        # [valid moves (4), safety scores (4), 5x5 food window (25)]
+        return self.encoder.encode(game).copy()
 
     def remember(self, state, action, reward, next_state, game_over):
-        pass
+        # Moves are stored as indices into [right, left, up, down]
+        if not isinstance(action, (int, np.integer)):
+            action = int(np.argmax(action))
+        self.memory.push(state, action, reward, next_state, game_over)
 
     def train_long_memory(self):
-        pass
+        if len(self.memory) == 0:
+            return
+        states, actions, rewards, next_states, dones = self.memory.sample(BATCH_SIZE)
+        self.trainer.train_step(states, actions, rewards, next_states, dones)
 
     def train_short_memory(self, state, action, reward, next_state, game_over):
-        pass
+        self.trainer.accumulate(state, action, reward, next_state, game_over)
 
     def get_action(self, state):
+        # random moves: tradeoff exploration / exploitation
         self.epsilon = 80 - self.n_games
         move = [0, 0, 0, 0]
         if random.randint(0, 200) < self.epsilon:
             move_idx = random.randint(0, 3)
-            move[move_idx] = 1
-        print(f'No more random moves..')
+        else:
+            with torch.inference_mode():
+                prediction = self.model(torch.as_tensor(state, dtype=torch.float32))
+            move_idx = int(torch.argmax(prediction))
+        move[move_idx] = 1
+        return move
+
+    def get_actions(self, states):
+        # get_action for a whole (N, 33) batch in one forward pass, as indices
+        self.epsilon = 80 - self.n_games
+        with torch.inference_mode():
+            q_values = self.model(torch.as_tensor(states, dtype=torch.float32)).numpy()
+        return epsilon_greedy(q_values, max(self.epsilon, 0) / 201, self.rng)
+
 
+def make_model():
+    # Picklable factory, so worker processes can build the same network
+    return Linear_QNet(STATE_SIZE, HIDDEN_SIZE, 4)
 
-def train():
+
+def train(headless=False, record=None, profile=None):
+    # record: path of an episode recording to append every game to
+    # profile: path to export timings to every 10s, as JSON lines or .prom text
+    torch.set_num_threads(NUM_THREADS)
     plot_scores = []
     plot_mean_scores = []
     total_score = []
     best_score = 0
     agent = Agent()
-    game = PacmanGameAI()
+    game = PacmanGameAI(headless=headless)
+    recorder = EpisodeWriter(record) if record else None
+    profiler = Profiler(profile) if profile else None
+    if profiler is not None:
+        profile_game(profiler, game)
+        profile_agent(profiler, agent)
+    if recorder is not None:
+        recorder.begin_episode()
     while True:
 
         state_old = agent.get_state(game)
         move = agent.get_action(state_old)
 
-        reward, game_over, score = game.play_step([1, 0, 0, 0])
+        reward, game_over, score = game.play_step(move)
+        state_new = agent.get_state(game)
+        if recorder is not None:
+            recorder.record(game, move, reward, game_over)
+        if profiler is not None:
+            profiler.maybe_export()
+
+        agent.train_short_memory(state_old, move, reward, state_new, game_over)
+        agent.remember(state_old, move, reward, state_new, game_over)
+
         if game_over:
+            if recorder is not None:
+                recorder.end_episode(score)
+                recorder.begin_episode()
             game.reset()
             agent.n_games += 1
+            agent.train_long_memory()
 
             if score > best_score:
                 best_score = score
+                agent.model.save()
+
+                print(f'Game: {agent.n_games} | Score: {score} | Best Score: {best_score} | '
+                      f'Updates/s: {agent.trainer.updates_per_second:.0f}')
 
-                print(f'Game: {agent.n_games} | Score: {score} | Best Score: {best_score}')
 
+def train_parallel(n_workers):
+    # Rollouts come from n_workers headless games in their own processes
+    from workers import RolloutPool
 
+    torch.set_num_threads(NUM_THREADS)
+    best_score = 0
+    agent = Agent()
+    with RolloutPool(n_workers, model_factory=make_model) as pool:
+        for batch in pool.batches():
+            agent.memory.push_batch(batch.states, batch.actions, batch.rewards,
+                                    batch.next_states, batch.dones)
+            agent.train_long_memory()
+
+            for score in batch.scores:
+                agent.n_games += 1
+                if score > best_score:
+                    best_score = score
+                    agent.model.save()
+
+                    print(f'Game: {agent.n_games} | Score: {score} | Best Score: {best_score} | '
+                          f'Updates/s: {agent.trainer.updates_per_second:.0f}')
+
+            # Same schedule as get_action: randint(0, 200) < 80 - n_games
+            epsilon = max(80 - agent.n_games, 0) / 201
+            pool.broadcast(agent.model.state_dict(), epsilon)
+
+
+def train_actor_learner(headless=False, replay_ratio=0.25, publish_interval=50):
+    # The game keeps playing on this thread while another one trains
+    from learner import ActorLearner
+
+    torch.set_num_threads(NUM_THREADS)
+    agent = Agent()
+    game = PacmanGameAI(headless=headless)
+    ActorLearner(agent, game, replay_ratio, publish_interval).run()
 
 
 if __name__ == "__main__":
-    train()
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=0,
+                        help='collect rollouts from this many worker processes')
+    parser.add_argument('--headless', action='store_true',
+                        help='train without opening the game window')
+    parser.add_argument('--record', metavar='PATH',
+                        help='append every episode to this recording')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='export timings here, as JSON lines or a .prom file')
+    parser.add_argument('--actor-learner', action='store_true',
+                        help='play and train on separate threads')
+    parser.add_argument('--replay-ratio', type=float, default=0.25,
+                        help='with --actor-learner, gradient updates per game step')
+    parser.add_argument('--publish-interval', type=int, default=50,
+                        help='with --actor-learner, updates between weight refreshes')
+    args = parser.parse_args()
+
+    if args.workers:
+        train_parallel(args.workers)
+    elif args.actor_learner:
+        train_actor_learner(args.headless, args.replay_ratio, args.publish_interval)
+    else:
+        train(args.headless, args.record, args.profile)
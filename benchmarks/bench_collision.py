@@ -0,0 +1,61 @@
+"""Wall collision checks: CollisionGrid lookups vs pygame spritecollide.
+
+Run from the repo root: python -m benchmarks.bench_collision
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pacman.collision import collide
+from pacman.maze import ACTOR_SIZE, load_maze
+from pacman.pacman import Player, static_sprites
+
+
+def checks_per_second(walls, positions, seconds):
+    probe = Player(*positions[0], 'images/Trollman.png')
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        probe.rect.topleft = positions[count % len(positions)]
+        collide(probe, walls)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def array_checks_per_second(table, positions, seconds):
+    # The BatchedPacmanEnv way: one fancy index for a whole batch of rects
+    xy = np.array(positions)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        table[xy[:, 1] // 30 + 1, xy[:, 0] // 30 + 1]
+        count += len(xy)
+    return count / (time.perf_counter() - start)
+
+
+def run(seconds, seed=0):
+    # Every tile of Pacman's lattice, in a fixed shuffled order
+    rng = np.random.default_rng(seed)
+    maze = load_maze()
+    x, y = maze.spawn('pacman')
+    positions = [(x % 30 + 30 * col, y % 30 + 30 * row)
+                 for row in range(20) for col in range(20)]
+    positions = [positions[i] for i in rng.permutation(len(positions))]
+    wall_list, _ = static_sprites()
+    wall_grid = maze.wall_grid
+    table = wall_grid.array(x, y, ACTOR_SIZE, ACTOR_SIZE)
+    return {
+        'sprites': {'checks_per_s': checks_per_second(wall_list, positions, seconds)},
+        'grid': {'checks_per_s': checks_per_second(wall_grid, positions, seconds)},
+        'grid_array': {'checks_per_s': array_checks_per_second(table, positions * 16, seconds)},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.0f}' for k, v in result.items()))
@@ -0,0 +1,64 @@
+"""Game step rate: PacmanGameAI headless and rendered, BatchedPacmanEnv at several sizes.
+
+Rendered games are timed without the clock's frame rate cap, so the
+numbers show the cost of drawing rather than SPEED.
+
+Run from the repo root: python -m benchmarks.bench_env
+Set SDL_VIDEODRIVER=dummy to time the rendered game without a display.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pacman.batch_env import BatchedPacmanEnv
+from pacman.pacman import PacmanGameAI
+
+BATCH_SIZES = [1, 64, 1024]
+
+
+def steps_per_second(game, seconds, seed):
+    actions = np.random.default_rng(seed).integers(0, 4, 4096).tolist()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        _, game_over, _ = game.play_step(actions[count % len(actions)])
+        if game_over:
+            game.reset()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def batch_steps_per_second(n_games, seconds, seed):
+    env = BatchedPacmanEnv(n_games, seed=seed)
+    actions = np.random.default_rng(seed).integers(0, 4, (64, n_games))
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        env.step(actions[count % len(actions)])
+        count += 1
+    return count * n_games / (time.perf_counter() - start)
+
+
+def run(seconds, seed=0):
+    rendered = PacmanGameAI(seed=seed)
+    # Draw every frame but skip the frame rate cap
+    rendered._tick = lambda: None
+    results = {
+        'headless': {'steps_per_s': steps_per_second(PacmanGameAI(headless=True, seed=seed),
+                                                     seconds, seed)},
+        'rendered': {'steps_per_s': steps_per_second(rendered, seconds, seed)},
+    }
+    for n_games in BATCH_SIZES:
+        results[f'batch_{n_games}'] = {
+            'steps_per_s': batch_steps_per_second(n_games, seconds, seed)}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.0f}' for k, v in result.items()))
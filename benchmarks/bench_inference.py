@@ -0,0 +1,70 @@
+"""Action selection throughput and latency, one state per call vs batched.
+
+Each round submits batch_size states to an InferenceServer, as that many
+games would, and waits for every action. Reports actions/s and the p50/p99
+time from submit() to the action being ready.
+
+Run from the repo root: python -m benchmarks.bench_inference
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from agent import STATE_SIZE, make_model
+from inference import InferenceServer
+
+BATCH_SIZES = [1, 4, 16, 64, 256, 1024]
+
+
+def per_call_rate(model, states, seconds):
+    # Agent.get_action style: one forward pass per state
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        with torch.inference_mode():
+            model(torch.as_tensor(states[count % len(states)]))
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def served_rate(model, states, batch_size, seconds, max_latency):
+    with InferenceServer(model, STATE_SIZE, max_batch_size=batch_size,
+                         max_latency=max_latency, epsilon=0.05, seed=0) as server:
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            futures = [server.submit(states[(count + i) % len(states)])
+                       for i in range(batch_size)]
+            for future in futures:
+                future.result()
+            count += batch_size
+        elapsed = time.perf_counter() - start
+    latency = server.latency_percentiles((50, 99))
+    return {'actions_per_s': count / elapsed,
+            'p50_ms': latency[50] * 1e3,
+            'p99_ms': latency[99] * 1e3,
+            'mean_batch': server.mean_batch_size()}
+
+
+def run(seconds, max_latency, batch_sizes=BATCH_SIZES, seed=0):
+    torch.manual_seed(seed)
+    model = make_model()
+    states = np.random.default_rng(seed).random((4096, STATE_SIZE), dtype=np.float32)
+    results = {'per_call': {'actions_per_s': per_call_rate(model, states, seconds)}}
+    for batch_size in batch_sizes:
+        results[f'batch_{batch_size}'] = served_rate(model, states, batch_size, seconds,
+                                                     max_latency)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument('--max-latency', type=float, default=0.002,
+                        help='batching window of the server, in seconds')
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds, args.max_latency).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.3f}' for k, v in result.items()))
@@ -0,0 +1,86 @@
+"""Replay memory size and sample latency, deque of tuples vs array buffers.
+
+Run from the repo root: python -m benchmarks.bench_replay
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+import torch
+
+from agent import STATE_SIZE, BATCH_SIZE
+from replay import ReplayBuffer, PrioritizedReplayBuffer
+
+
+def fill_deque(n, rng):
+    memory = deque(maxlen=n)
+    for _ in range(n):
+        state = rng.random(STATE_SIZE).tolist()
+        next_state = rng.random(STATE_SIZE).tolist()
+        memory.append((state, [1, 0, 0, 0], 0, next_state, False))
+    return memory
+
+
+def sample_deque(memory, batch_size):
+    mini_sample = random.sample(memory, batch_size)
+    states, actions, rewards, next_states, dones = zip(*mini_sample)
+    return (torch.tensor(states, dtype=torch.float), torch.tensor(actions, dtype=torch.long),
+            torch.tensor(rewards, dtype=torch.float), torch.tensor(next_states, dtype=torch.float),
+            dones)
+
+
+def fill_buffer(buffer, n, rng):
+    states = rng.random((n, STATE_SIZE), dtype=np.float32)
+    buffer.push_batch(states, rng.integers(0, 4, n), np.zeros(n), states, np.zeros(n, bool))
+    return buffer
+
+
+def time_call(fn, repeats):
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1e3
+
+
+def run(size, batch_size, repeats, seed=0):
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    results = {}
+
+    tracemalloc.start()
+    memory = fill_deque(size, rng)
+    results['deque'] = {'memory_mb': tracemalloc.get_traced_memory()[0] / 2**20,
+                        'sample_ms': time_call(lambda: sample_deque(memory, batch_size), repeats)}
+    tracemalloc.stop()
+    del memory
+
+    buffer = fill_buffer(ReplayBuffer(size, STATE_SIZE, batch_size), size, rng)
+    results['array'] = {'memory_mb': buffer.nbytes / 2**20,
+                        'sample_ms': time_call(lambda: buffer.sample(batch_size), repeats)}
+
+    buffer = fill_buffer(PrioritizedReplayBuffer(size, STATE_SIZE, batch_size), size, rng)
+    indices = np.arange(batch_size)
+    errors = rng.random(batch_size)
+    results['prioritized'] = {
+        'memory_mb': (buffer.nbytes + buffer.tree.tree.nbytes) / 2**20,
+        'sample_ms': time_call(lambda: buffer.sample(batch_size), repeats),
+        'update_ms': time_call(lambda: buffer.update_priorities(indices, errors), repeats),
+    }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    for name, result in run(args.size, args.batch_size, args.repeats).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.3f}' for k, v in result.items()))
@@ -0,0 +1,35 @@
+"""PacmanGameAI.reset() rate, headless and rendered.
+
+Run from the repo root: python -m benchmarks.bench_reset
+Set SDL_VIDEODRIVER=dummy to time the rendered game without a display.
+"""
+import argparse
+import time
+
+from pacman.pacman import PacmanGameAI
+
+
+def resets_per_second(game, seconds):
+    game.reset()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game.reset()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(seconds):
+    return {
+        'headless': {'resets_per_s': resets_per_second(PacmanGameAI(headless=True), seconds)},
+        'rendered': {'resets_per_s': resets_per_second(PacmanGameAI(), seconds)},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds).items():
+        print(f'{name:10s} {result["resets_per_s"]:10.0f} resets/s')
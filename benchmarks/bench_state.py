@@ -0,0 +1,67 @@
+"""State encoding latency: Agent.get_state, StateEncoder and GridEncoder.
+
+Run from the repo root: python -m benchmarks.bench_state
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agent import Agent
+from pacman.batch_env import BatchedPacmanEnv
+from pacman.pacman import PacmanGameAI
+from pacman.state import GridEncoder, StateEncoder
+
+
+def time_call(fn, seconds):
+    fn()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def played_game(seed, steps=50):
+    # A game some way in, so ghosts are out and pellets are gone
+    game = PacmanGameAI(headless=True, seed=seed)
+    actions = np.random.default_rng(seed)
+    for _ in range(steps):
+        if game.play_step(int(actions.integers(4)))[1]:
+            game.reset()
+    return game
+
+
+def run(seconds, n_games=1024, seed=0):
+    game = played_game(seed)
+    agent = Agent()
+    encoder = StateEncoder()
+    maze_encoder = StateEncoder(maze_distance=True)
+    env = BatchedPacmanEnv(n_games, seed=seed)
+    batch_encoder = StateEncoder(n_games)
+    batch_us = time_call(lambda: batch_encoder.encode_batch(env.pacman, env.ghosts, env.pellets),
+                         seconds)
+    grid_encoder = GridEncoder()
+    stacked_encoder = GridEncoder(frames=4)
+    batch_grid_encoder = GridEncoder(n_games)
+    grid_batch_us = time_call(
+        lambda: batch_grid_encoder.encode_batch(env.pacman, env.ghosts, env.pellets), seconds)
+    return {
+        'get_state': {'us': time_call(lambda: agent.get_state(game), seconds)},
+        'encode': {'us': time_call(lambda: encoder.encode(game), seconds)},
+        'encode_maze_distance': {'us': time_call(lambda: maze_encoder.encode(game), seconds)},
+        f'encode_batch_{n_games}': {'us': batch_us, 'per_state_us': batch_us / n_games},
+        'grid': {'us': time_call(lambda: grid_encoder.encode(game), seconds)},
+        'grid_4_frames': {'us': time_call(lambda: stacked_encoder.encode(game), seconds)},
+        f'grid_batch_{n_games}': {'us': grid_batch_us, 'per_state_us': grid_batch_us / n_games},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds).items():
+        print(f'{name:22s} ' + ' | '.join(f'{k}: {v:.2f}' for k, v in result.items()))
@@ -0,0 +1,57 @@
+"""QTrainer update rate on long-memory batches and on short-memory single steps.
+
+Run from the repo root: python -m benchmarks.bench_train
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from agent import BATCH_SIZE, LR, NUM_THREADS, STATE_SIZE, make_model
+from model import QTrainer
+
+
+def updates_per_second(trainer, batch, seconds):
+    trainer.train_step(*batch)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        trainer.train_step(*batch)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def make_batch(rng, n):
+    states = rng.random((n, STATE_SIZE), dtype=np.float32)
+    return (states, rng.integers(0, 4, n), rng.random(n, dtype=np.float32),
+            rng.random((n, STATE_SIZE), dtype=np.float32), rng.random(n) < 0.01)
+
+
+def run(seconds, batch_size=BATCH_SIZE, seed=0):
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    # Train with the threads train() uses, without leaving them set for other benchmarks
+    threads = torch.get_num_threads()
+    torch.set_num_threads(NUM_THREADS)
+    try:
+        trainer = QTrainer(make_model(), lr=LR, gamma=0.9)
+        long_rate = updates_per_second(trainer, make_batch(rng, batch_size), seconds)
+        short_rate = updates_per_second(trainer, [a[0] for a in make_batch(rng, 1)], seconds)
+    finally:
+        torch.set_num_threads(threads)
+    return {
+        f'batch_{batch_size}': {'updates_per_s': long_rate,
+                                'samples_per_s': long_rate * batch_size},
+        'single': {'updates_per_s': short_rate},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds, args.batch_size).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.0f}' for k, v in result.items()))
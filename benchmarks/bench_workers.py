@@ -0,0 +1,55 @@
+"""Rollout throughput of RolloutPool at several worker counts.
+
+Each worker plays one headless game with the policy network at
+train_parallel's starting epsilon. Transitions are counted once every
+worker has delivered a batch, so process start-up is left out. speedup
+is the rate over the one worker rate; on N free cores it should stay
+close to N.
+
+Run from the repo root: python -m benchmarks.bench_workers
+"""
+import argparse
+import os
+import time
+
+from agent import make_model
+from workers import RolloutPool
+
+
+def default_worker_counts():
+    cpus = os.cpu_count() or 1
+    return sorted({1, 2, max(cpus // 2, 1), cpus})
+
+
+def transitions_per_second(n_workers, seconds, batch_size=256, seed=0):
+    with RolloutPool(n_workers, model_factory=make_model, batch_size=batch_size,
+                     epsilon=80 / 201, seed=seed) as pool:
+        started = set()
+        while len(started) < n_workers:
+            started.add(pool.get(timeout=120).worker_id)
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            count += len(pool.get(timeout=120).actions)
+        return count / (time.perf_counter() - start)
+
+
+def run(seconds, worker_counts=None, batch_size=256, seed=0):
+    results = {}
+    for n_workers in worker_counts or default_worker_counts():
+        rate = transitions_per_second(n_workers, seconds, batch_size, seed)
+        results[f'workers_{n_workers}'] = {'transitions_per_s': rate}
+    base = next(iter(results.values()))['transitions_per_s']
+    for result in results.values():
+        result['speedup'] = result['transitions_per_s'] / base
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--workers', type=int, nargs='+', help='worker counts to time')
+    args = parser.parse_args()
+
+    for name, result in run(args.seconds, args.workers).items():
+        print(f'{name:12s} ' + ' | '.join(f'{k}: {v:.2f}' for k, v in result.items()))
@@ -0,0 +1,117 @@
+"""Every benchmark in one run, saved as JSON to compare across commits.
+
+Results are flattened to 'benchmark.case.metric' keys and written with the
+commit, library versions and machine they came from. With --compare, each
+metric is also printed as a ratio to the same metric in an older results
+file. The SDL dummy video driver is used unless SDL_VIDEODRIVER is set, so
+this runs on machines without a display.
+
+Run from the repo root: python -m benchmarks.run --output results.json
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pygame
+import torch
+
+from benchmarks import (bench_collision, bench_env, bench_inference, bench_replay,
+                        bench_reset, bench_state, bench_train, bench_workers)
+
+# Metric names (the last part of a key) where a smaller number is better:
+# times and sizes. For everything else, rates and speedups, bigger is.
+LOWER_IS_BETTER_UNITS = ('ms', 'us', 'mb')
+
+
+def benchmarks(seconds, seed):
+    return {
+        'env': lambda: bench_env.run(seconds, seed),
+        'reset': lambda: bench_reset.run(seconds),
+        'state': lambda: bench_state.run(seconds, seed=seed),
+        'collision': lambda: bench_collision.run(seconds, seed),
+        'replay': lambda: bench_replay.run(100_000, 1000, 50, seed),
+        'train': lambda: bench_train.run(seconds, seed=seed),
+        'inference': lambda: bench_inference.run(seconds, 0.002, seed=seed),
+        'workers': lambda: bench_workers.run(seconds, seed=seed),
+    }
+
+
+def flatten(results):
+    return {f'{bench}.{case}.{metric}': float(value)
+            for bench, cases in results.items()
+            for case, metrics in cases.items()
+            for metric, value in metrics.items()}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'torch': torch.__version__,
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+    }
+
+
+def lower_is_better(name):
+    metric = name.rsplit('.', 1)[-1]
+    return metric.rsplit('_', 1)[-1] in LOWER_IS_BETTER_UNITS
+
+
+def compare(metrics, baseline):
+    for name, value in metrics.items():
+        old = baseline.get(name)
+        if not old:
+            print(f'{name:50s} {value:14.3f}')
+            continue
+        ratio = value / old
+        better = ratio < 1 if lower_is_better(name) else ratio > 1
+        print(f'{name:50s} {value:14.3f} {ratio:7.2f}x {"better" if better else "worse"}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='time spent on each timed case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help='run only these benchmarks')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', metavar='PATH', help='an earlier results file')
+    args = parser.parse_args()
+
+    results = {}
+    for name, bench in benchmarks(args.seconds, args.seed).items():
+        if args.only and name not in args.only:
+            continue
+        print(f'running {name}', file=sys.stderr)
+        results[name] = bench()
+
+    metrics = flatten(results)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'seconds': args.seconds, 'seed': args.seed,
+                   'metrics': metrics}, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['metrics']
+    compare(metrics, baseline)
@@ -0,0 +1,14 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Tests never need a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# Compiled mazes and distance tables go to a throwaway cache, not the
+# user's ~/.cache. Set before anything imports pacman.maze, which reads it
+# once, and inherited by the worker and command line subprocesses.
+_cache_dir = tempfile.mkdtemp(prefix='rl-pacman-test-cache-')
+os.environ['PACMAN_CACHE_DIR'] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
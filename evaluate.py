@@ -0,0 +1,156 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import Counter
+
+# The summary goes to stdout as JSON, keep pygame's banner out of it
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import torch
+
+from agent import make_model
+from pacman.pacman import PacmanGameAI
+from pacman.state import StateEncoder
+
+GHOST_NAMES = ('blinky', 'pinky', 'inky', 'clyde')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Set up once per worker process by _init_worker
+_policy = None
+
+
+def load_policy(checkpoint):
+    """The network saved by Linear_QNet.save(), ready for inference"""
+    model = make_model()
+    model.load_state_dict(torch.load(checkpoint, map_location='cpu', weights_only=True))
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+def _init_worker(checkpoint, maze_distance, maze, max_steps):
+    global _policy
+    # One core per worker, like the rollout workers
+    torch.set_num_threads(1)
+    game = PacmanGameAI(headless=True, maze_distance=maze_distance, maze=maze)
+    _policy = (load_policy(checkpoint), game, StateEncoder(dtype=np.float32, maze=game.maze),
+               max_steps)
+
+
+def play_episode(seed):
+    """One greedy, headless episode with the ghosts' RNG seeded by seed.
+
+    Ends when a ghost catches Pacman, when the board is cleared or after
+    max_steps moves. Returns the seed, score, length, pellets eaten and
+    outcome: the name of the ghost that caught Pacman, 'cleared' or
+    'timeout'.
+    """
+    model, game, encoder, max_steps = _policy
+    game.reset(seed=seed)
+    outcome = 'timeout'
+    with torch.inference_mode():
+        while game.frame_iteration < max_steps:
+            q_values = model(torch.from_numpy(encoder.encode(game)))
+            _, game_over, _ = game.play_step(int(q_values.argmax()))
+            if game_over:
+                # Blinky, Pinky, Inky and Clyde are checked in that order
+                outcome = next(name for name, ghost in zip(GHOST_NAMES, game.ghosts)
+                               if ghost.rect.colliderect(game.pacman.rect))
+                break
+            if game.pellets_left == 0:
+                outcome = 'cleared'
+                break
+    return {'seed': seed, 'score': game.score, 'length': game.frame_iteration,
+            'pellets_eaten': int(game.maze.pellets.sum()) - game.pellets_left,
+            'outcome': outcome}
+
+
+def _stats(values):
+    values = np.asarray(values, dtype=np.float64)
+    stats = {'mean': float(values.mean()), 'std': float(values.std()),
+             'min': float(values.min()), 'max': float(values.max()),
+             'median': float(np.median(values))}
+    stats.update({f'p{p}': float(v) for p, v in zip(PERCENTILES,
+                                                    np.percentile(values, PERCENTILES))})
+    return stats
+
+
+def summarize(episodes):
+    """Score, length and pellet statistics plus outcome counts over episodes"""
+    outcomes = Counter(episode['outcome'] for episode in episodes)
+    return {
+        'episodes': len(episodes),
+        'score': _stats([episode['score'] for episode in episodes]),
+        'length': _stats([episode['length'] for episode in episodes]),
+        'pellets_eaten': _stats([episode['pellets_eaten'] for episode in episodes]),
+        'outcomes': {name: outcomes[name] for name in GHOST_NAMES + ('cleared', 'timeout')},
+    }
+
+
+def evaluate(checkpoint, n_episodes=200, workers=None, seed=0, max_steps=2000,
+             maze_distance=False, maze=None, mp_context=None):
+    """Play n_episodes greedy episodes of a checkpoint across a process pool.
+
+    Episode i seeds the ghosts with seed + i, so a checkpoint is always
+    scored on the same games whatever the number of workers. workers=0
+    plays every episode in this process.
+    """
+    if n_episodes < 1:
+        raise ValueError(f'n_episodes must be at least 1, got {n_episodes}')
+    start = time.perf_counter()
+    seeds = range(seed, seed + n_episodes)
+    init_args = (checkpoint, maze_distance, maze, max_steps)
+    if workers == 0:
+        _init_worker(*init_args)
+        episodes = [play_episode(s) for s in seeds]
+    else:
+        workers = workers or os.cpu_count() or 1
+        ctx = mp.get_context(mp_context)
+        with ctx.Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            chunksize = max(1, n_episodes // (4 * workers))
+            episodes = pool.map(play_episode, seeds, chunksize)
+    seconds = time.perf_counter() - start
+
+    summary = summarize(episodes)
+    summary.update({'checkpoint': checkpoint, 'seed': seed, 'max_steps': max_steps,
+                    'seconds': seconds, 'episodes_per_second': n_episodes / seconds,
+                    'per_episode': episodes})
+    return summary
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score a saved policy over greedy episodes')
+    parser.add_argument('checkpoint', nargs='?', default=os.path.join('model', 'model.pth'))
+    parser.add_argument('--episodes', type=positive_int, default=200)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes to play in, one per CPU by default')
+    parser.add_argument('--seed', type=int, default=0, help='ghost seed of the first episode')
+    parser.add_argument('--max-steps', type=int, default=2000,
+                        help='stop an episode Pacman survives this long')
+    parser.add_argument('--maze-distance', action='store_true',
+                        help='ghosts chase by shortest path')
+    parser.add_argument('--maze', help='maze name or path, room one by default')
+    parser.add_argument('--output', metavar='PATH', help='also write the summary here')
+    parser.add_argument('--per-episode', action='store_true',
+                        help='keep every episode in the summary')
+    args = parser.parse_args()
+
+    summary = evaluate(args.checkpoint, args.episodes, args.workers, args.seed, args.max_steps,
+                       args.maze_distance, args.maze)
+    if not args.per_episode:
+        del summary['per_episode']
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
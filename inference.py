@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+
+def epsilon_greedy(q_values, epsilon, rng):
+    """Greedy action per row of q_values, replaced by a uniform one with chance epsilon.
+
+    epsilon is a scalar or one value per row; the whole batch takes two draws.
+    """
+    actions = np.argmax(q_values, axis=1)
+    n, n_actions = q_values.shape
+    explore = rng.random(n) < epsilon
+    if explore.any():
+        actions[explore] = rng.integers(0, n_actions, explore.sum())
+    return actions
+
+
+class InferenceServer:
+    """Batches action requests from many games into one forward pass.
+
+    Games (threads of this process, or worker connections relaying for
+    other processes) call submit() with a single state and get a Future
+    resolving to an action index into [right, left, up, down]. A serving
+    thread waits for the first pending request, then keeps collecting
+    until max_batch_size states are queued or max_latency seconds have
+    passed, runs the model once over them and applies epsilon-greedy to
+    the whole batch. act() does the same synchronously for callers that
+    already hold a batch, e.g. a BatchedPacmanEnv.
+    """
+
+    def __init__(self, model, state_size, max_batch_size=256, max_latency=0.002,
+                 epsilon=0.0, seed=None, history=100_000):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+        self.states = np.zeros((max_batch_size, state_size), dtype=np.float32)
+        self.requests = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+        # Request latencies and batch sizes, kept in fixed size rings
+        self.latencies = np.zeros(history)
+        self.batch_sizes = np.zeros(history, dtype=np.int64)
+        self.n_requests = 0
+        self.n_batches = 0
+
+    def act(self, states, epsilon=None):
+        """Action indices for an (N, state_size) batch of states"""
+        with self.lock, torch.inference_mode():
+            q_values = self.model(torch.as_tensor(states, dtype=torch.float32)).numpy()
+        return epsilon_greedy(q_values, self.epsilon if epsilon is None else epsilon, self.rng)
+
+    def submit(self, state):
+        """Queue one state, returns a Future for its action index"""
+        future = Future()
+        self.requests.put((state, future, time.perf_counter()))
+        return future
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.running = False
+        # Wake the serving thread if it is waiting for a first request
+        self.requests.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load_state_dict(self, state_dict):
+        """Swap in new weights between batches"""
+        with self.lock:
+            self.model.load_state_dict(state_dict)
+
+    def latency_percentiles(self, percentiles=(50, 99)):
+        """Request latency percentiles in seconds, over the recorded history"""
+        n = min(self.n_requests, len(self.latencies))
+        if n == 0:
+            return {p: 0. for p in percentiles}
+        values = np.percentile(self.latencies[:n], percentiles)
+        return dict(zip(percentiles, values))
+
+    def mean_batch_size(self):
+        n = min(self.n_batches, len(self.batch_sizes))
+        return self.batch_sizes[:n].mean() if n else 0.
+
+    def _collect(self):
+        # Block for the first request, then fill the batch until it is full
+        # or the latency window closes
+        first = self.requests.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self.requests.get(timeout=max(timeout, 0.))
+            except queue.Empty:
+                break
+            if request is None:
+                self.running = False
+                break
+            batch.append(request)
+        return batch
+
+    def _serve(self):
+        while self.running:
+            batch = self._collect()
+            if not batch:
+                continue
+            n = len(batch)
+            for i, (state, _, _) in enumerate(batch):
+                self.states[i] = state
+            try:
+                actions = self.act(self.states[:n])
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+
+            now = time.perf_counter()
+            for i, (_, future, submitted) in enumerate(batch):
+                self.latencies[(self.n_requests + i) % len(self.latencies)] = now - submitted
+                future.set_result(int(actions[i]))
+            self.n_requests += n
+            self.batch_sizes[self.n_batches % len(self.batch_sizes)] = n
+            self.n_batches += 1
+
+        # Anything still queued will never be served
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request[1].cancel()
@@ -0,0 +1,175 @@
+import copy
+import queue
+import threading
+
+import numpy as np
+import torch
+
+from agent import BATCH_SIZE
+from inference import epsilon_greedy
+from workers import TransitionBatch
+
+
+class ActorLearner:
+    """Plays and learns at the same time, on two threads.
+
+    The actor (the thread calling run()) steps the game, picks actions with
+    its own copy of the network and sends transitions chunk_size at a time
+    through a queue of at most max_pending chunks. The learner thread
+    inserts them into the agent's replay memory and runs train_step() on
+    sampled batches, replay_ratio updates per environment step once warmup
+    transitions are stored. Every publish_interval updates it publishes
+    the weights, which the actor loads before its next move.
+
+    The learner only takes new chunks once it has done the updates it owes,
+    so a slow learner fills the queue and the actor blocks on it: the
+    ratio holds to within max_pending chunks either way. PyTorch releases
+    the GIL during its kernels, so the game keeps running while the
+    gradients are computed.
+    """
+
+    def __init__(self, agent, game, replay_ratio=0.25, publish_interval=50, chunk_size=32,
+                 max_pending=8, batch_size=BATCH_SIZE, warmup=None, seed=None):
+        self.agent = agent
+        self.game = game
+        self.replay_ratio = replay_ratio
+        self.publish_interval = publish_interval
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.warmup = self.batch_size if warmup is None else warmup
+        self.rng = np.random.default_rng(seed)
+        self.chunks = queue.Queue(max_pending)
+
+        # The actor's network, only ever written with published weights
+        self.actor_model = copy.deepcopy(agent.model)
+        self.actor_model.requires_grad_(False)
+        self._weights = None
+        self._weights_lock = threading.Lock()
+
+        self.steps = 0
+        self.inserted = 0
+        self.updates = 0
+        self.published = 0
+        self.best_score = 0
+        self.stopping = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def owed_updates(self):
+        """Updates due for the transitions stored so far, beyond those done"""
+        due = int(self.replay_ratio * max(self.inserted - self.warmup, 0))
+        return due - self.updates
+
+    def publish(self):
+        state_dict = {k: v.detach().clone() for k, v in self.agent.model.state_dict().items()}
+        with self._weights_lock:
+            self._weights = state_dict
+        self.published += 1
+
+    def _load_published(self):
+        with self._weights_lock:
+            weights, self._weights = self._weights, None
+        if weights is not None:
+            self.actor_model.load_state_dict(weights)
+
+    def _update(self):
+        agent = self.agent
+        states, actions, rewards, next_states, dones = agent.memory.sample(self.batch_size)
+        agent.trainer.train_step(states, actions, rewards, next_states, dones)
+        self.updates += 1
+        if self.updates % self.publish_interval == 0:
+            self.publish()
+
+    def _insert(self, batch):
+        self.agent.memory.push_batch(batch.states, batch.actions, batch.rewards,
+                                     batch.next_states, batch.dones)
+        self.inserted += len(batch.actions)
+        for score in batch.scores:
+            if score > self.best_score:
+                self.best_score = score
+                self.agent.model.save()
+                print(f'Game: {self.agent.n_games} | Score: {score} | '
+                      f'Best Score: {self.best_score} | '
+                      f'Updates/s: {self.agent.trainer.updates_per_second:.0f}')
+
+    def _learn(self):
+        try:
+            while True:
+                while self.owed_updates() > 0:
+                    self._update()
+                batch = self.chunks.get()
+                if batch is None:
+                    return
+                self._insert(batch)
+        except BaseException as exc:
+            self.error = exc
+            self.stopping.set()
+
+    def _put(self, batch):
+        # Block while the learner is behind, but notice if it died
+        while True:
+            if self.stopping.is_set():
+                raise RuntimeError('learner thread stopped') from self.error
+            try:
+                self.chunks.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def run(self, max_steps=None):
+        """Play and learn until max_steps environment steps, or forever"""
+        agent, game, n = self.agent, self.game, self.chunk_size
+        states = np.empty((n, agent.memory.states.shape[1]), dtype=np.float32)
+        next_states = np.empty_like(states)
+        actions = np.empty(n, dtype=np.int64)
+        rewards = np.empty(n, dtype=np.float32)
+        dones = np.empty(n, dtype=bool)
+        scores = []
+        i = 0
+
+        self.thread = threading.Thread(target=self._learn, daemon=True)
+        self.thread.start()
+        try:
+            state = agent.get_state(game)
+            while max_steps is None or self.steps < max_steps:
+                self._load_published()
+                # Same schedule as Agent.get_action: randint(0, 200) < 80 - n_games
+                epsilon = max(80 - agent.n_games, 0) / 201
+                with torch.inference_mode():
+                    state_tensor = torch.as_tensor(state[None], dtype=torch.float32)
+                    q_values = self.actor_model(state_tensor).numpy()
+                action = int(epsilon_greedy(q_values, epsilon, self.rng)[0])
+
+                reward, game_over, score = game.play_step(action)
+                next_state = agent.get_state(game)
+                states[i], actions[i], rewards[i] = state, action, reward
+                next_states[i], dones[i] = next_state, game_over
+                i += 1
+                self.steps += 1
+
+                if game_over:
+                    scores.append(score)
+                    agent.n_games += 1
+                    game.reset()
+                    next_state = agent.get_state(game)
+                state = next_state
+
+                if i == n or (max_steps is not None and self.steps == max_steps):
+                    self._put(TransitionBatch(0, states[:i].copy(), actions[:i].copy(),
+                                              rewards[:i].copy(), next_states[:i].copy(),
+                                              dones[:i].copy(), scores))
+                    scores = []
+                    i = 0
+        finally:
+            self.close()
+        if self.error is not None:
+            raise RuntimeError('learner thread failed') from self.error
+
+    def close(self):
+        """Let the learner catch up with what was sent, then stop it"""
+        if self.thread is None:
+            return
+        if not self.stopping.is_set():
+            self._put(None)
+        self.thread.join()
+        self.thread = None
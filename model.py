@@ -0,0 +1,114 @@
+import copy
+import os
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+
+
+class Linear_QNet(nn.Module):
+    def __init__(self, input_size, hidden_size, output_size):
+        super().__init__()
+        self.linear1 = nn.Linear(input_size, hidden_size)
+        self.linear2 = nn.Linear(hidden_size, output_size)
+
+    def forward(self, x):
+        x = F.relu(self.linear1(x))
+        x = self.linear2(x)
+        return x
+
+    def save(self, file_name='model.pth'):
+        model_folder_path = './model'
+        os.makedirs(model_folder_path, exist_ok=True)
+        torch.save(self.state_dict(), os.path.join(model_folder_path, file_name))
+
+
+class QTrainer:
+    """Double DQN updates on whole batches, with a periodically synced target network.
+
+    train_step() runs the online network once over states and next states
+    stacked together, picks the next action with it, scores that action
+    with the target network and builds every target with tensor ops.
+    accumulate() buffers single transitions (short memory) and trains on
+    them micro_batch at a time.
+    """
+
+    def __init__(self, model, lr, gamma, target_update=100, micro_batch=1):
+        self.lr = lr
+        self.gamma = gamma
+        self.model = model
+        self.target_model = copy.deepcopy(model)
+        self.target_model.requires_grad_(False)
+        self.target_update = target_update
+        self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
+
+        self.micro_batch = micro_batch
+        self._pending = []
+
+        self.updates = 0
+        self.update_seconds = 0.
+
+    @property
+    def updates_per_second(self):
+        return self.updates / self.update_seconds if self.update_seconds else 0.
+
+    def train_step(self, state, action, reward, next_state, done, weights=None):
+        """One gradient step on a transition or a batch of them.
+
+        action holds indices into [right, left, up, down] or one-hot rows.
+        weights are optional per-sample importance weights (prioritized
+        replay). Returns the TD errors, e.g. to update replay priorities.
+        """
+        start = time.perf_counter()
+        state = torch.as_tensor(state, dtype=torch.float32)
+        next_state = torch.as_tensor(next_state, dtype=torch.float32)
+        action = torch.as_tensor(action, dtype=torch.long)
+        reward = torch.as_tensor(reward, dtype=torch.float32)
+        done = torch.as_tensor(done, dtype=torch.bool)
+
+        if state.dim() == 1:
+            # A single transition, make it a batch of one
+            state = state.unsqueeze(0)
+            next_state = next_state.unsqueeze(0)
+            action = action.unsqueeze(0)
+            reward = reward.reshape(1)
+            done = done.reshape(1)
+        if action.dim() == 2:
+            action = action.argmax(dim=1)
+
+        n = len(state)
+        q_values, next_q_online = self.model(torch.cat((state, next_state))).split(n)
+        q_taken = q_values.gather(1, action.unsqueeze(1)).squeeze(1)
+        with torch.no_grad():
+            next_action = next_q_online.argmax(dim=1, keepdim=True)
+            next_q = self.target_model(next_state).gather(1, next_action).squeeze(1)
+            target = reward + self.gamma * next_q * (~done)
+
+        td_error = target - q_taken
+        if weights is None:
+            loss = td_error.pow(2).mean()
+        else:
+            loss = (torch.as_tensor(weights, dtype=torch.float32) * td_error.pow(2)).mean()
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        self.updates += 1
+        if self.updates % self.target_update == 0:
+            self.target_model.load_state_dict(self.model.state_dict())
+        self.update_seconds += time.perf_counter() - start
+        return td_error.detach()
+
+    def accumulate(self, state, action, reward, next_state, done):
+        """Queue one transition, training once micro_batch of them are queued"""
+        self._pending.append((state, action, reward, next_state, done))
+        if len(self._pending) < self.micro_batch:
+            return None
+        states, actions, rewards, next_states, dones = zip(*self._pending)
+        self._pending = []
+        return self.train_step(np.array(states), np.array(actions), np.array(rewards),
+                               np.array(next_states), np.array(dones))
@@ -0,0 +1,180 @@
+import numpy as np
+
+from .collision import TILE
+from .distance import ghost_distances
+from .maze import ACTOR_SIZE, as_maze
+
+# Deltas in the order get_valid_directions tries them: RIGHT, LEFT, DOWN, UP.
+# PacmanGameAI._move maps [right, left, up, down] onto the very same deltas,
+# so one table serves both the action one-hots and the ghost directions.
+DELTAS = np.array([[30, 0], [-30, 0], [0, 30], [0, -30]])
+RIGHT, LEFT, DOWN, UP = range(4)
+REVERSE = np.array([LEFT, RIGHT, UP, DOWN])
+
+FOLLOW_CHANCE = 0.15
+KEEP_STRAIGHT_CHANCE = 0.7
+
+
+def _choice(mask, u):
+    # Pick uniformly among the True entries of each row, using one draw per row
+    counts = mask.sum(axis=1)
+    k = (u * counts).astype(np.int64)
+    return np.argmax(mask.cumsum(axis=1) > k[:, None], axis=1)
+
+
+class BatchedPacmanEnv:
+    """N games of PacmanGameAI advanced in lockstep on NumPy arrays.
+
+    The dynamics are the same as play_step: Pacman is blocked by walls and
+    the gate, ghosts leave the spawn box and then wander, chasing Pacman
+    some of the time, pellets are eaten and touching a ghost ends the game.
+    Each step draws a (4, N, 4) block of uniforms from the env's NumPy
+    generator: follow chance, keep-straight chance, wandering choice and
+    spawn choice, per game and ghost. A seeded env therefore plays different
+    games than a PacmanGameAI with the same seed, but fed the same draws the
+    two match step for step. Finished games are reset automatically.
+    maze_distance=True makes chasing ghosts compare shortest path distances
+    instead of Manhattan ones, like PacmanGameAI(maze_distance=True).
+    maze is a Maze or the name of one, room one by default.
+    """
+
+    def __init__(self, n_games, seed=None, maze_distance=False, maze=None):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        self.maze = as_maze(maze)
+        self.distance_field = ghost_distances(self.maze) if maze_distance else None
+
+        # Spawns in the order PacmanGameAI creates the actors: Pacman, then
+        # Blinky, Pinky, Inky and Clyde
+        self.pacman_start = self.maze.spawns[0]
+        self.ghost_starts = self.maze.spawns[1:]
+        self.pacman_walls = self.maze.blocked[0]
+        self.pacman_gate = self.maze.gate_blocked
+        # One table per ghost, since Inky and Clyde sit on their own lattices
+        self.ghost_walls = self.maze.blocked[1:]
+        self.template = self.maze.pellets
+
+        self.pacman = np.zeros((n_games, 2), dtype=np.int64)
+        self.ghosts = np.zeros((n_games, 4, 2), dtype=np.int64)
+        self.ghost_directions = np.zeros((n_games, 4), dtype=np.int64)
+        self.has_left_spawn = np.zeros((n_games, 4), dtype=bool)
+        self.pellets = np.zeros((n_games,) + self.template.shape, dtype=bool)
+        self.scores = np.zeros(n_games, dtype=np.int64)
+        self.frame_iterations = np.zeros(n_games, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset every game, or only the games where mask is True"""
+        if mask is None:
+            mask = np.ones(self.n_games, dtype=bool)
+        self.pacman[mask] = self.pacman_start
+        self.ghosts[mask] = self.ghost_starts
+        self.ghost_directions[mask] = UP
+        self.has_left_spawn[mask] = False
+        self.pellets[mask] = self.template
+        self.scores[mask] = 0
+        self.frame_iterations[mask] = 0
+
+    def step(self, actions):
+        """Advance every game by one tick.
+
+        actions is an (N, 4) array of one-hot [right, left, up, down] rows,
+        or an (N,) array of action indices. Returns (rewards, dones, scores);
+        for finished games scores holds the final score from before the reset.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            # Like _move, anything but an exact one-hot leaves Pacman in place
+            moving = (actions == 1).sum(axis=1) == 1
+            moving &= (actions == 0).sum(axis=1) == 3
+            actions = np.argmax(actions, axis=1)
+        else:
+            moving = (actions >= 0) & (actions < 4)
+        self.frame_iterations += 1
+
+        self._move_pacman(actions, moving)
+        self._move_ghosts()
+
+        rewards = np.zeros(self.n_games, dtype=np.int64)
+
+        # Pacman's lattice holds exactly one pellet cell under each tile
+        rows = self.pacman[:, 1] // TILE
+        cols = self.pacman[:, 0] // TILE
+        games = np.arange(self.n_games)
+        ate = self.pellets[games, rows, cols]
+        self.pellets[games, rows, cols] = False
+        self.scores += ate
+        rewards += 10 * ate
+
+        # Two 32x32 rects overlap when both offsets are under 32
+        offsets = np.abs(self.ghosts - self.pacman[:, None, :])
+        dones = ((offsets < ACTOR_SIZE).all(axis=2)).any(axis=1)
+        rewards -= 10 * dones
+
+        scores = self.scores.copy()
+        if dones.any():
+            self.reset(dones)
+        return rewards, dones, scores
+
+    def _move_pacman(self, actions, moving):
+        target = self.pacman + DELTAS[actions] * moving[:, None]
+        rows = target[:, 1] // TILE + 1
+        cols = target[:, 0] // TILE + 1
+        blocked = self.pacman_walls[rows, cols] | self.pacman_gate[rows, cols]
+        self.pacman = np.where(blocked[:, None], self.pacman, target)
+
+    def _move_ghosts(self):
+        n = self.n_games
+        x = self.ghosts[:, :, 0]
+        y = self.ghosts[:, :, 1]
+
+        # (N, 4 ghosts, 4 directions) of free neighbouring tiles
+        targets = self.ghosts[:, :, None, :] + DELTAS
+        rows = targets[..., 1] // TILE + 1
+        cols = targets[..., 0] // TILE + 1
+        valid = ~self.ghost_walls[np.arange(4)[:, None], rows, cols]
+        any_valid = valid.any(axis=2)
+
+        # Ghost.is_in_spawn
+        self.has_left_spawn |= any_valid & (y < self.maze.spawn_line_y)
+        in_spawn = any_valid & ~self.has_left_spawn
+
+        u = self.rng.random((4, n, 4))
+
+        # Normal wandering, skipping the reverse direction unless at a dead end
+        filtered = valid.copy()
+        filtered[np.arange(n)[:, None], np.arange(4), REVERSE[self.ghost_directions]] = False
+        dead_end = ~filtered.any(axis=2)
+        filtered[dead_end] = valid[dead_end]
+
+        pac = self.pacman[:, None, None, :]
+        if self.distance_field is not None:
+            distance = self.distance_field.distance(targets, pac).astype(np.int64)
+        else:
+            distance = np.abs(targets - pac).sum(axis=3)
+        distance = np.where(filtered, distance, np.iinfo(np.int64).max)
+        chase = np.argmin(distance, axis=2)
+
+        current_ok = np.take_along_axis(filtered, self.ghost_directions[..., None], axis=2)[..., 0]
+        follow = u[0] < FOLLOW_CHANCE
+        keep = ~follow & current_ok & (u[1] < KEEP_STRAIGHT_CHANCE)
+
+        choice = _choice(filtered.reshape(-1, 4), u[2].reshape(-1)).reshape(n, 4)
+        choice = np.where(keep, self.ghost_directions, choice)
+        choice = np.where(follow, chase, choice)
+
+        # Spawn exit: line up with the gate, then go up, else shuffle sideways
+        horizontal = valid.copy()
+        horizontal[..., DOWN:] = False
+        shuffle = np.where(horizontal.any(axis=2),
+                           _choice(horizontal.reshape(-1, 4), u[3].reshape(-1)).reshape(n, 4),
+                           _choice(valid.reshape(-1, 4), u[3].reshape(-1)).reshape(n, 4))
+        spawn = np.where(valid[..., UP], UP, shuffle)
+        exit_x = self.maze.spawn_exit_x
+        spawn = np.where((x > exit_x + 20) & valid[..., LEFT], LEFT, spawn)
+        spawn = np.where((x < exit_x - 20) & valid[..., RIGHT], RIGHT, spawn)
+        choice = np.where(in_spawn, spawn, choice)
+
+        # Ghosts with nowhere to go stay put and keep their direction
+        self.ghost_directions = np.where(any_valid, choice, self.ghost_directions)
+        self.ghosts = self.ghosts + DELTAS[choice] * any_valid[..., None]
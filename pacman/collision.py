@@ -0,0 +1,66 @@
+import numpy as np
+import pygame
+
+TILE = 30
+
+
+class CollisionGrid:
+    """Precomputed collision lookups against a static set of rects.
+
+    Actors only ever move in 30px steps from their spawn point, so a rect of a
+    given size always sits at the same offset inside its tile. The first time a
+    rect with a new (offset, size) is checked, one table is compiled by testing
+    that rect against the walls on every tile of the lattice. After that every
+    check is a single list index, giving exactly the answer spritecollide would.
+    """
+
+    def __init__(self, rects, width=606, height=606):
+        self.rects = [pygame.Rect(r) for r in rects]
+        # One extra tile of margin on every side
+        self.cols = width // TILE + 3
+        self.rows = height // TILE + 3
+        self._tables = {}
+
+    def table(self, offset_x, offset_y, width, height):
+        """Flat row-major table of collisions for a rect at (offset, size) on each tile"""
+        key = (offset_x % TILE, offset_y % TILE, width, height)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = self._compile(*key)
+        return table
+
+    def array(self, offset_x, offset_y, width, height):
+        """table() as a (rows, cols) bool array, indexed by [y // TILE + 1, x // TILE + 1]"""
+        return np.array(self.table(offset_x, offset_y, width, height),
+                        dtype=bool).reshape(self.rows, self.cols)
+
+    def load(self, offset_x, offset_y, width, height, array):
+        """Use an array() compiled earlier, e.g. loaded from a cache, for this (offset, size)"""
+        key = (offset_x % TILE, offset_y % TILE, width, height)
+        self._tables[key] = np.asarray(array, dtype=bool).ravel().tolist()
+
+    def collides(self, rect):
+        table = self.table(rect.left, rect.top, rect.width, rect.height)
+        col = rect.left // TILE + 1
+        row = rect.top // TILE + 1
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return table[row * self.cols + col]
+        # Off the compiled lattice, fall back to testing every rect
+        return rect.collidelist(self.rects) != -1
+
+    def _compile(self, offset_x, offset_y, width, height):
+        table = []
+        probe = pygame.Rect(0, 0, width, height)
+        for row in range(self.rows):
+            for col in range(self.cols):
+                probe.left = (col - 1) * TILE + offset_x
+                probe.top = (row - 1) * TILE + offset_y
+                table.append(probe.collidelist(self.rects) != -1)
+        return table
+
+
+def collide(sprite, walls):
+    """True if sprite overlaps walls, which is a CollisionGrid or a sprite group"""
+    if isinstance(walls, CollisionGrid):
+        return walls.collides(sprite.rect)
+    return bool(pygame.sprite.spritecollide(sprite, walls, False))
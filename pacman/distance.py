@@ -0,0 +1,171 @@
+import hashlib
+import os
+from collections import deque
+
+import numpy as np
+
+from .collision import TILE
+from .maze import CACHE_DIR, as_maze
+
+# Neighbouring cells as (row, col) steps, in the order of the ghost directions
+# and batch_env.DELTAS: RIGHT, LEFT, DOWN (y + 30), UP (y - 30)
+STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# Distance between tiles that cannot reach each other, or are not walkable
+UNREACHABLE = np.iinfo(np.uint16).max
+
+
+class DistanceField:
+    """All-pairs shortest paths, in moves, between the walkable tiles of a maze.
+
+    blocked is a CollisionGrid.array() style table, indexed by
+    [y // TILE + 1, x // TILE + 1]; the walkable tiles are the free cells
+    connected to start, a (row, col) cell of that table. Positions passed to
+    the queries are pixel (x, y) pairs, or arrays of them with the pairs on
+    the last axis, so whole batches of games are looked up at once.
+    Positions off the walkable tiles are UNREACHABLE from everywhere.
+    """
+
+    def __init__(self, blocked, start, distances=None):
+        self.blocked = np.asarray(blocked, dtype=bool)
+        self.start = tuple(start)
+        self.cells = self._flood(self.blocked, self.start)
+        n = len(self.cells)
+
+        # Node index per table cell; n is the extra node for every other cell
+        self.index = np.full(self.blocked.shape, n, dtype=np.int64)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(n)
+        # Node reached by each step from each node, n where the step is blocked
+        rows, cols = self.blocked.shape
+        self.neighbours = np.full((n + 1, 4), n, dtype=np.int64)
+        for k, (dr, dc) in enumerate(STEPS):
+            r = self.cells[:, 0] + dr
+            c = self.cells[:, 1] + dc
+            inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+            self.neighbours[:n, k][inside] = self.index[r[inside], c[inside]]
+
+        if distances is None or distances.shape != (n + 1, n + 1):
+            distances = self._all_pairs()
+        self.distances = distances
+        self.next_moves = self._next_moves()
+
+    @staticmethod
+    def _flood(blocked, start):
+        seen = {start}
+        todo = deque([start])
+        while todo:
+            row, col = todo.popleft()
+            for dr, dc in STEPS:
+                cell = (row + dr, col + dc)
+                if (cell not in seen and 0 <= cell[0] < blocked.shape[0]
+                        and 0 <= cell[1] < blocked.shape[1] and not blocked[cell]):
+                    seen.add(cell)
+                    todo.append(cell)
+        return np.array(sorted(seen), dtype=np.int64).reshape(-1, 2)
+
+    def _all_pairs(self):
+        # One breadth-first search per tile
+        n = len(self.cells)
+        neighbours = self.neighbours[:n].tolist()
+        distances = np.full((n + 1, n + 1), UNREACHABLE, dtype=np.uint16)
+        for source in range(n):
+            row = [UNREACHABLE] * n
+            row[source] = 0
+            todo = deque([source])
+            while todo:
+                node = todo.popleft()
+                step = row[node] + 1
+                for neighbour in neighbours[node]:
+                    if neighbour < n and row[neighbour] == UNREACHABLE:
+                        row[neighbour] = step
+                        todo.append(neighbour)
+            distances[source, :n] = row
+        return distances
+
+    def _next_moves(self):
+        # Direction from each node that starts a shortest path to each target,
+        # first in STEPS order on ties; -1 at the target itself or unreachable
+        n = len(self.cells)
+        via = self.distances[self.neighbours[:n]].astype(np.int64)  # (n, 4, n + 1)
+        best = np.argmin(via, axis=1)
+        best_distance = np.take_along_axis(via, best[:, None], axis=1)[:, 0]
+        moves = np.where(best_distance < UNREACHABLE, best, -1).astype(np.int8)
+        moves[np.arange(n), np.arange(n)] = -1
+        return np.vstack([moves, np.full((1, n + 1), -1, dtype=np.int8)])
+
+    def __len__(self):
+        return len(self.cells)
+
+    def node(self, position):
+        """Node index of a pixel position, or len(self) off the walkable tiles"""
+        position = np.asarray(position)
+        return self.index[position[..., 1] // TILE + 1, position[..., 0] // TILE + 1]
+
+    def distance(self, a, b):
+        """Moves on the shortest path from position a to position b"""
+        return self.distances[self.node(a), self.node(b)]
+
+    def next_move(self, a, b):
+        """Direction (RIGHT, LEFT, DOWN, UP) to step from a towards b, -1 if none"""
+        return self.next_moves[self.node(a), self.node(b)]
+
+
+def _key(blocked, start):
+    digest = hashlib.sha1(np.packbits(blocked).tobytes())
+    digest.update(repr((blocked.shape, tuple(start))).encode())
+    return digest.hexdigest()
+
+
+_fields = {}
+
+
+def load_distance_field(blocked, start, cache_dir=CACHE_DIR):
+    """DistanceField for a table, from memory, then disk, computing it only once"""
+    blocked = np.asarray(blocked, dtype=bool)
+    key = _key(blocked, start)
+    if key in _fields:
+        return _fields[key]
+
+    path = os.path.join(cache_dir, f'distance-{key}.npy') if cache_dir else None
+    cached = None
+    if path is not None and os.path.exists(path):
+        try:
+            cached = np.load(path)
+        except (OSError, ValueError):
+            cached = None
+    field = DistanceField(blocked, start, cached)
+
+    if path is not None and field.distances is not cached:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                np.save(f, field.distances)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # A read-only cache only costs the recomputation
+    _fields[key] = field
+    return field
+
+
+def _cell(position):
+    x, y = (int(v) for v in position)
+    return y // TILE + 1, x // TILE + 1
+
+
+def pacman_distances(maze=None, cache_dir=CACHE_DIR):
+    """Maze distances along Pacman's moves, which the gate blocks"""
+    maze = as_maze(maze)
+    blocked = maze.blocked[0] | maze.gate_blocked
+    return load_distance_field(blocked, _cell(maze.spawns[0]), cache_dir)
+
+
+def ghost_distances(maze=None, cache_dir=CACHE_DIR):
+    """Maze distances along the ghosts' moves, through the gate and the spawn box.
+
+    In room one every ghost's lattice gives the same tiles, and Pacman's
+    tiles are a subset of them, so this one field serves all four ghosts
+    and Pacman. It is built on Pinky's lattice, from inside the spawn box.
+    """
+    maze = as_maze(maze)
+    return load_distance_field(maze.blocked[2], _cell(maze.spawns[2]), cache_dir)
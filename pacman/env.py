@@ -0,0 +1,101 @@
+from functools import partial
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from .pacman import PacmanGameAI, SPEED
+from .state import GridEncoder, StateEncoder, STATE_SIZE
+
+
+class PacmanEnv(gym.Env):
+    """PacmanGameAI behind the Gymnasium reset()/step() interface.
+
+    Observations are Agent.get_state's 33 features as float32, all in [0, 1].
+    observation='grid' gives the whole board instead, as GridEncoder's
+    (frame_stack * 8, 19, 19) float32 planes of the last frame_stack steps.
+    Actions are integers indexing [right, left, up, down]. Episodes end when
+    a ghost catches Pacman; info carries the game's score.
+    render_mode='human' shows the game window, otherwise the game is headless.
+    maze is a Maze or the name of one (see maze.py), room one by default.
+
+    action_repeat=k plays each action for k game ticks, stopping early
+    when Pacman is caught, and returns the sum of their rewards. With gamma
+    set the reward is instead the n-step discounted return
+    r_1 + gamma r_2 + ... + gamma^(n-1) r_n over the n ticks played, and
+    info['discount'] is gamma^n, the factor to bootstrap the next
+    observation's value with. info['steps'] is n either way.
+    """
+
+    metadata = {'render_modes': ['human'], 'render_fps': SPEED}
+
+    def __init__(self, render_mode=None, render_every=1, maze=None, action_repeat=1,
+                 gamma=None, observation='features', frame_stack=1):
+        if render_mode is not None and render_mode not in self.metadata['render_modes']:
+            raise ValueError(f'Unsupported render_mode {render_mode!r}')
+        if observation not in ('features', 'grid'):
+            raise ValueError(f'Unsupported observation {observation!r}')
+        if action_repeat < 1:
+            raise ValueError(f'action_repeat must be at least 1, got {action_repeat}')
+        self.render_mode = render_mode
+        self.action_repeat = action_repeat
+        self.gamma = gamma
+        self.game = PacmanGameAI(headless=render_mode is None, render_every=render_every,
+                                 maze=maze)
+        if observation == 'grid':
+            self.encoder = GridEncoder(frames=frame_stack, maze=self.game.maze)
+            shape = self.encoder.shape
+        else:
+            self.encoder = StateEncoder(dtype=np.float32, maze=self.game.maze)
+            shape = (STATE_SIZE,)
+        self.observation_space = spaces.Box(0., 1., shape=shape, dtype=np.float32)
+        self.action_space = spaces.Discrete(4)
+
+    def _observation(self):
+        return self.encoder.encode(self.game).copy()
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        # Without a seed the ghosts carry on with the game's RNG stream
+        self.game.reset(seed=seed)
+        if isinstance(self.encoder, GridEncoder):
+            self.encoder.reset()
+        return self._observation(), {'score': self.game.score}
+
+    def step(self, action):
+        action = int(action)
+        gamma = 1. if self.gamma is None else self.gamma
+        total, discount = 0., 1.
+        # Only the observation after the last tick is encoded
+        for steps in range(1, self.action_repeat + 1):
+            reward, game_over, score = self.game.play_step(action)
+            total += discount * reward
+            discount *= gamma
+            if game_over:
+                break
+        info = {'score': score, 'steps': steps}
+        if self.gamma is not None:
+            info['discount'] = discount
+        return self._observation(), total, game_over, False, info
+
+    def render(self):
+        # In 'human' mode the game draws itself during play_step
+        return None
+
+
+def make_vector_env(num_envs, asynchronous=False, **kwargs):
+    """num_envs PacmanEnvs batched into a Gymnasium vector env.
+
+    asynchronous=True steps each env in its own process (AsyncVectorEnv),
+    otherwise they are stepped one after another in this one (SyncVectorEnv).
+    kwargs go to every PacmanEnv. Observations come back stacked on a new
+    first axis either way: (num_envs, 33) arrays of features, or with
+    observation='grid' (num_envs, frame_stack * 8, 19, 19) arrays of planes.
+    """
+    env_fns = [partial(PacmanEnv, **kwargs) for _ in range(num_envs)]
+    if asynchronous:
+        return gym.vector.AsyncVectorEnv(env_fns)
+    return gym.vector.SyncVectorEnv(env_fns)
+
+
+gym.register(id='PacmanAI-v0', entry_point='pacman.env:PacmanEnv')
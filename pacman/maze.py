@@ -0,0 +1,234 @@
+"""Mazes described as data and compiled into lookup tables.
+
+A maze is a JSON file or a text file. JSON gives the walls and the gate
+as [x, y, width, height] pixel rects, plus the size of the board, every
+actor's spawn point and the tiles that never get a pellet (see
+mazes/room_one.json). Text draws the maze one character per 30px tile:
+
+    #  wall               .  pellet            (space)  empty
+    -  gate, blocks Pacman but not the ghosts
+    P  Pacman    B  Blinky    K  Pinky    I  Inky    C  Clyde
+
+Compiling a maze tests every tile of every actor's lattice against the
+walls, like CollisionGrid does, and works out the pellet template. The
+result is saved under CACHE_DIR keyed by a hash of the maze file, so
+later loads in any process are a single np.load.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pygame
+
+from .collision import CollisionGrid, TILE
+
+MAZE_DIR = os.path.join(os.path.dirname(__file__), 'mazes')
+DEFAULT_MAZE = 'room_one'
+CACHE_DIR = os.environ.get('PACMAN_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'rl-pacman'))
+# Bumped whenever compiled mazes change shape or meaning
+COMPILE_VERSION = 1
+
+ACTORS = ('pacman', 'blinky', 'pinky', 'inky', 'clyde')
+ACTOR_SIZE = 32
+# Neighbouring tiles as (dx, dy) in the ghost direction order: RIGHT, LEFT, DOWN, UP
+MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# Text mazes place actors like room one does within their tiles
+TEXT_SPAWN_OFFSETS = {'pacman': (17, 19), 'blinky': (17, 19), 'pinky': (17, 19),
+                      'inky': (15, 19), 'clyde': (19, 19)}
+TEXT_ACTORS = {'P': 'pacman', 'B': 'blinky', 'K': 'pinky', 'I': 'inky', 'C': 'clyde'}
+
+
+def parse_text(text, name):
+    """The JSON form of a text maze"""
+    rows = [line for line in text.splitlines() if line.strip()]
+    walls, gates, spawns, pellets = [], [], {}, []
+    for r, line in enumerate(rows):
+        c = 0
+        while c < len(line):
+            char = line[c]
+            if char in '#-':
+                # Merge runs of the same tile into one rect
+                end = c
+                while end + 1 < len(line) and line[end + 1] == char:
+                    end += 1
+                # A rect that stops any actor offset 15-19 px into this run of
+                # tiles, and none in the tiles around it
+                if char == '#':
+                    walls.append([30 * c + 21, 30 * r + 21, 30 * (end - c) + 24, 28])
+                else:
+                    gates.append([30 * c + 21, 30 * r + 34, 30 * (end - c) + 24, 2])
+                c = end + 1
+                continue
+            if char in TEXT_ACTORS:
+                actor = TEXT_ACTORS[char]
+                dx, dy = TEXT_SPAWN_OFFSETS[actor]
+                spawns[actor] = [30 * c + dx, 30 * r + dy]
+            elif char == '.':
+                pellets.append([r, c])
+            elif char != ' ':
+                raise ValueError(f'{name}: unknown maze character {char!r} at row {r}, column {c}')
+            c += 1
+
+    missing = set(ACTORS) - set(spawns)
+    if missing:
+        raise ValueError(f'{name}: no spawn for {", ".join(sorted(missing))}')
+    if len(gates) != 1:
+        raise ValueError(f'{name}: a maze needs exactly one run of gate tiles')
+    gate = gates[0]
+    return {
+        'name': name,
+        'size': [30 * max(len(line) for line in rows) + 6, 30 * len(rows) + 6],
+        'walls': walls,
+        'gate': gate,
+        'spawns': spawns,
+        'spawn_exit_x': gate[0] + gate[2] // 2,
+        'spawn_line_y': gate[1] - 2,
+        'pellets': pellets,
+    }
+
+
+def _pellet_rect(row, column):
+    return pygame.Rect(30 * column + 32, 30 * row + 32, 4, 4)
+
+
+def compile_maze(spec):
+    """Lookup tables for a maze given in its JSON form"""
+    width, height = spec['size']
+    walls = CollisionGrid(spec['walls'], width, height)
+    gate = CollisionGrid([spec['gate']], width, height)
+    spawns = np.array([spec['spawns'][actor] for actor in ACTORS], dtype=np.int64)
+
+    # Per actor, which tiles of its lattice hit a wall, [y // TILE + 1, x // TILE + 1]
+    blocked = np.stack([walls.array(x, y, ACTOR_SIZE, ACTOR_SIZE) for x, y in spawns])
+    gate_blocked = gate.array(*spawns[0], ACTOR_SIZE, ACTOR_SIZE)
+
+    # Legal moves per actor and tile, Pacman also stopped by the gate
+    pacman_blocked = blocked.copy()
+    pacman_blocked[0] |= gate_blocked
+    padded = np.pad(pacman_blocked, ((0, 0), (1, 1), (1, 1)), constant_values=True)
+    rows, cols = blocked.shape[1:]
+    moves = np.stack([~padded[:, 1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+                      for dx, dy in MOVES], axis=-1)
+
+    # Pellets sit at the middle of the tiles, [y // TILE, x // TILE] of Pacman
+    pellets = np.zeros(((height - ACTOR_SIZE) // TILE, (width - ACTOR_SIZE) // TILE), dtype=bool)
+    if 'pellets' in spec:
+        for row, column in spec['pellets']:
+            if row < pellets.shape[0] and column < pellets.shape[1]:
+                pellets[row, column] = True
+    else:
+        pacman_start = pygame.Rect(*spawns[0], ACTOR_SIZE, ACTOR_SIZE)
+        no_pellets = {tuple(cell) for cell in spec.get('no_pellets', [])}
+        for row in range(pellets.shape[0]):
+            for column in range(pellets.shape[1]):
+                block = _pellet_rect(row, column)
+                pellets[row, column] = ((row, column) not in no_pellets
+                                        and not walls.collides(block)
+                                        and not block.colliderect(pacman_start))
+    return {'spawns': spawns, 'blocked': blocked, 'gate_blocked': gate_blocked,
+            'moves': moves, 'pellets': pellets}
+
+
+class Maze:
+    """A compiled maze.
+
+    spawns is the (5, 2) array of Pacman's, Blinky's, Pinky's, Inky's and
+    Clyde's start positions. blocked[i] is actor i's wall table and
+    gate_blocked Pacman's gate table, both indexed [y // TILE + 1,
+    x // TILE + 1] like CollisionGrid.array(); moves[i] holds the legal
+    RIGHT, LEFT, DOWN, UP moves on the same indices. pellets is the
+    read-only pellet template, indexed [y // TILE, x // TILE].
+    wall_grid and gate_grid come with those tables already compiled.
+    """
+
+    def __init__(self, spec, tables, key=None):
+        self.spec = spec
+        self.key = key
+        self.name = spec['name']
+        self.size = tuple(spec['size'])
+        self.walls = spec['walls']
+        self.gate = spec['gate']
+        self.spawn_exit_x = spec['spawn_exit_x']
+        self.spawn_line_y = spec['spawn_line_y']
+        for name, table in tables.items():
+            table.flags.writeable = False
+            setattr(self, name, table)
+
+        self.wall_grid = CollisionGrid(self.walls, *self.size)
+        self.gate_grid = CollisionGrid([self.gate], *self.size)
+        for (x, y), table in zip(self.spawns, self.blocked):
+            self.wall_grid.load(x, y, ACTOR_SIZE, ACTOR_SIZE, table)
+        self.gate_grid.load(*self.spawns[0], ACTOR_SIZE, ACTOR_SIZE, self.gate_blocked)
+
+    def spawn(self, actor):
+        return tuple(int(v) for v in self.spawns[ACTORS.index(actor)])
+
+
+def maze_path(name):
+    """The file of a maze given by path, or by name from MAZE_DIR"""
+    if os.path.exists(name):
+        return name
+    for ext in ('.json', '.txt'):
+        path = os.path.join(MAZE_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f'No maze {name!r} in {MAZE_DIR}')
+
+
+def as_maze(maze):
+    """maze if it is a Maze already, else the maze of that name or path (None for the default)"""
+    if isinstance(maze, Maze):
+        return maze
+    return load_maze(DEFAULT_MAZE if maze is None else maze)
+
+
+_mazes = {}
+
+
+def load_maze(name=DEFAULT_MAZE, cache_dir=CACHE_DIR):
+    """A compiled Maze, from memory, then the cache file, compiling it only once"""
+    path = maze_path(name)
+    with open(path, 'rb') as f:
+        source = f.read()
+    key = hashlib.sha1(b'%d:' % COMPILE_VERSION + source).hexdigest()
+    if key in _mazes:
+        return _mazes[key]
+
+    cache_path = os.path.join(cache_dir, f'maze-{key}.npz') if cache_dir else None
+    maze = None
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as data:
+                spec = json.loads(data['spec'].item())
+                maze = Maze(spec, {k: data[k] for k in data.files if k != 'spec'}, key)
+        except (OSError, ValueError, KeyError):
+            maze = None
+
+    if maze is None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if path.endswith('.json'):
+            spec = json.loads(source)
+            spec.setdefault('name', stem)
+            # Like text mazes, ghosts head for the middle of the gate and have
+            # left the spawn box once above it
+            gate = spec['gate']
+            spec.setdefault('spawn_exit_x', gate[0] + gate[2] // 2)
+            spec.setdefault('spawn_line_y', gate[1] - 2)
+        else:
+            spec = parse_text(source.decode(), stem)
+        tables = compile_maze(spec)
+        maze = Maze(spec, tables, key)
+        if cache_path is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = f'{cache_path}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    np.savez(f, spec=np.array(json.dumps(spec)), **tables)
+                os.replace(tmp, cache_path)
+            except OSError:
+                pass  # A read-only cache only costs the recompilation
+    _mazes[key] = maze
+    return maze
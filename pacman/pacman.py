@@ -1,7 +1,11 @@
+import os
+import numpy as np
 import pygame
 import random
 from enum import Enum
-from .rooms import setupRoomOne
+from collections import namedtuple
+from .collision import collide
+from .maze import as_maze
 
 SPEED = 15
   
@@ -13,19 +17,36 @@ red = (255,0,0)
 purple = (255,0,255)
 yellow   = ( 255, 255,0)
 
-# Player and Hgosts size
-w = 303-16 #Width
-p_h = (7*60)+19 #Pacman height
-m_h = (4*60)+19 #Monster height
-b_h = (3*60)+19 #Binky height
-i_w = 303-16-32 #Inky width
-c_w = 303+(32-16) #Clyde width
-
-Trollicon=pygame.image.load('images/Trollman.png')
-pygame.display.set_icon(Trollicon)
-
-pygame.init()
-font = pygame.font.Font("freesansbold.ttf", 24)
+# Pacman's moves for actions [right, left, up, down]
+action_deltas = [(30, 0), (-30, 0), (0, 30), (0, -30)]
+one_hot_actions = {(1, 0, 0, 0): 0, (0, 1, 0, 0): 1, (0, 0, 1, 0): 2, (0, 0, 0, 1): 3}
+
+# Assets are found relative to the code, whatever the working directory.
+# Importing this module touches neither them nor SDL: the display and the
+# font are set up the first time a game actually renders.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(PACKAGE_DIR)
+FONT_PATH = os.path.join(PACKAGE_DIR, 'freesansbold.ttf')
+
+_font = None
+
+def get_font():
+    """The score font, initialising pygame's font module on first use"""
+    global _font
+    if _font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _font = pygame.font.Font(FONT_PATH, 24)
+    return _font
+
+def init_display():
+    """Initialise only SDL's video subsystem, which windows and events need"""
+    if not pygame.display.get_init():
+        # Leave SIGINT and SIGTERM to Python: SDL would otherwise turn them
+        # into QUIT events, which nothing reads in a run that stopped drawing
+        os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+        pygame.display.init()
+        pygame.display.set_icon(load_image('images/Trollman.png'))
 
 class Wall(pygame.sprite.Sprite):
     def __init__(self,x,y,width,height, color):
@@ -51,13 +72,141 @@ class Direction(Enum):
     UP = 3
     DOWN = 4
 
+# Everything that changes during a game, in plain picklable values.
+# Positions are (left, top) for Pacman then Blinky, Pinky, Inky and Clyde;
+# pellets is the 19x19 pellet map packed with np.packbits.
+GameSnapshot = namedtuple(
+    'GameSnapshot',
+    ['positions', 'ghost_directions', 'has_left_spawn', 'pellets', 'pellets_left',
+     'score', 'best_score', 'frame_iteration', 'rng_state'])
+
+_images = {}
+
+def load_image(filename):
+    """Load an image from disk once per process, sprites share the surface"""
+    # convert() needs a display mode, which headless games never set
+    converted = pygame.display.get_surface() is not None
+    image = _images.get((filename, converted))
+    if image is None:
+        # Relative paths are relative to the repository, not the working directory
+        image = pygame.image.load(os.path.join(ROOT_DIR, filename))
+        if converted:
+            image = image.convert()
+        _images[(filename, converted)] = image
+    return image
+
+_static_sprites = {}
+
+def static_sprites(maze=None):
+    """A maze's wall and gate sprite groups, built once per process and shared by every game"""
+    maze = as_maze(maze)
+    if maze.key not in _static_sprites:
+        wall_list = pygame.sprite.RenderPlain()
+        for rect in maze.walls:
+            wall_list.add(Wall(*rect, blue))
+        gate = pygame.sprite.RenderPlain()
+        gate.add(Wall(*maze.gate, white))
+        _static_sprites[maze.key] = (wall_list, gate)
+    return _static_sprites[maze.key]
+
+class Renderer:
+    """Draws a game onto the screen, updating only what changed since the last frame.
+
+    The walls and the gate are drawn once onto a cached background. Each
+    frame restores the background under the actors' old and new rects, the
+    pellets eaten or put back since the last frame and the score if it
+    changed, redraws the pellets and actors over those rects and passes
+    just them to pygame.display.update(). invalidate() forces the next
+    frame to redraw and flip the whole screen.
+    """
+
+    def __init__(self, screen, maze):
+        self.screen = screen
+        self.maze = maze
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(black)
+        wall_list, gate = static_sprites(maze)
+        wall_list.draw(self.background)
+        gate.draw(self.background)
+        self.pellet_image = Block(yellow, 4, 4).image
+
+        # What is on the screen now
+        self.pellets = np.zeros_like(maze.pellets)
+        self.actor_rects = []
+        self.score_text = None
+        self.score_rect = pygame.Rect(10, 10, 0, 0)
+        self.invalidate()
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def _pellet_cells(self, rect):
+        # Rows and columns of the pellets a rect overlaps
+        rows, cols = self.pellets.shape
+        r0 = max((rect.top - 36) // 30 + 1, 0)
+        r1 = min((rect.bottom - 33) // 30 + 1, rows)
+        c0 = max((rect.left - 36) // 30 + 1, 0)
+        c1 = min((rect.right - 33) // 30 + 1, cols)
+        return r0, r1, c0, c1
+
+    def draw(self, game):
+        actors = (game.pacman,) + game.ghosts
+        actor_rects = [actor.rect.copy() for actor in actors]
+        score = (game.score, game.best_score)
+        if self.score_text is None or score != self.score_text[0]:
+            text = get_font().render("Score: "+str(game.score)+"/"+str(game.best_score),
+                                     True, red)
+            self.score_text = (score, text)
+            dirty = [self.score_rect.copy()]
+            self.score_rect = text.get_rect(topleft=(10, 10))
+            dirty.append(self.score_rect)
+        else:
+            dirty = []
+
+        if self.full_redraw:
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty += self.actor_rects
+            dirty += [rect for rect in actor_rects if rect not in self.actor_rects]
+            for row, column in np.argwhere(self.pellets != game.pellets).tolist():
+                dirty.append(pygame.Rect(30*column+32, 30*row+32, 4, 4))
+        self.pellets[...] = game.pellets
+        self.actor_rects = actor_rects
+        # The antialiased text blends into what is under it, so it is only
+        # drawn over a freshly restored background
+        if not self.full_redraw and self.score_rect.collidelist(dirty) != -1 \
+                and self.score_rect not in dirty:
+            dirty.append(self.score_rect)
+        draw_score = self.score_rect in dirty or self.full_redraw
+
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+            r0, r1, c0, c1 = self._pellet_cells(rect)
+            for row, column in np.argwhere(self.pellets[r0:r1, c0:c1]).tolist():
+                self.screen.blit(self.pellet_image, (30*(c0+column)+32, 30*(r0+row)+32))
+        for actor in actors:
+            self.screen.blit(actor.image, actor.rect)
+        if draw_score:
+            self.screen.blit(self.score_text[1], self.score_rect)
+
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(dirty)
+        return dirty
+
 class Player(pygame.sprite.Sprite):
     def __init__(self,x,y, filename):
         pygame.sprite.Sprite.__init__(self)
-        self.image = pygame.image.load(filename).convert()
+        self.image = load_image(filename)
         self.rect = self.image.get_rect()
         self.rect.top = y
         self.rect.left = x
+        self.start = (x, y)
+
+    def respawn(self):
+        self.rect.left, self.rect.top = self.start
 
     def move(self, dx, dy, walls, gate):
         # Get the old position, in case we need to go back to it
@@ -68,20 +217,20 @@ class Player(pygame.sprite.Sprite):
         self.rect.left = old_x + dx
         
         # Check for wall collision
-        if pygame.sprite.spritecollide(self, walls, False):
+        if collide(self, walls):
             # Hit a wall, go back
             self.rect.left = old_x
         else:
             # Try to move vertically
             self.rect.top = old_y + dy
             
-            if pygame.sprite.spritecollide(self, walls, False):
+            if collide(self, walls):
                 # Hit a wall, go back
                 self.rect.top = old_y
         
         # Check gate collision
         if gate != False:
-            if pygame.sprite.spritecollide(self, gate, False):
+            if collide(self, gate):
                 # Hit gate, go back to original position
                 self.rect.left = old_x
                 self.rect.top = old_y
@@ -102,7 +251,7 @@ class Player(pygame.sprite.Sprite):
             self.rect.left = old_x + dx
             self.rect.top = old_y + dy
             
-            wall_hit = pygame.sprite.spritecollide(self, walls, False)
+            wall_hit = collide(self, walls)
             
             # Restore position
             self.rect.left = old_x
@@ -127,14 +276,23 @@ class Player(pygame.sprite.Sprite):
 
 #Inheritime Player klassist
 class Ghost(Player):
-    def __init__(self, x, y, filename):
+    def __init__(self, x, y, filename, rng=random):
         super().__init__(x, y, filename)
+        self.rng = rng  # random.Random (or the random module) driving this ghost
         self.direction = Direction.UP  # Start with a default direction
         self.previous_position = (x, y)
         self.follow_chance = 0.15  # 15% chance to follow Pacman
         self.start_y = y  # Remember starting Y position
         self.has_left_spawn = False  # Track if ghost has ever left spawn
         self.spawn_exit_target = 303  # Target x position for exiting spawn
+        self.spawn_line_y = 240  # Ghosts above this line have left the spawn box
+        self.distance_field = None  # A DistanceField makes following use maze distance
+
+    def respawn(self):
+        super().respawn()
+        self.direction = Direction.UP
+        self.previous_position = self.start
+        self.has_left_spawn = False
     
    
     def is_in_spawn(self):
@@ -143,8 +301,8 @@ class Ghost(Player):
         # The spawn area is roughly where ghosts start (middle box area)
         if not self.has_left_spawn:
             # Check if we're still in the spawn box area
-            # The gate is at y=242, ghosts spawn around y=259 (m_h) and y=199 (b_h)
-            if self.rect.top < 240:  # Above the gate line
+            # In room one the gate is at y=242 and ghosts spawn at y=259 and y=199
+            if self.rect.top < self.spawn_line_y:  # Above the gate line
                 self.has_left_spawn = True
                 return False
             return True
@@ -157,7 +315,7 @@ class Ghost(Player):
         self.rect.left = old_x + dx
         self.rect.top = old_y + dy
         # Check wall collision
-        if pygame.sprite.spritecollide(self, walls, False):
+        if collide(self, walls):
             # Hit a wall, go back
             self.rect.left = old_x
             self.rect.top = old_y
@@ -176,8 +334,6 @@ class Ghost(Player):
     
     # Random movement with occasional Pacman following
     def choose_move(self, pacman_pos, walls, gate=None):
-        import random
-        
         # Get valid directions (returns list of tuples: (Direction, dx, dy))
         valid_dirs = self.get_valid_directions(walls, gate)
         
@@ -210,13 +366,13 @@ class Ghost(Player):
             # If can't move up, try moving horizontally first to find a path
             horizontal_dirs = [d for d in valid_dirs if d[0] in [Direction.LEFT, Direction.RIGHT]]
             if horizontal_dirs:
-                dir_enum, dx, dy = random.choice(horizontal_dirs)
+                dir_enum, dx, dy = self.rng.choice(horizontal_dirs)
                 self.direction = dir_enum
                 return (dx, dy)
             
             # Last resort - try any valid direction
             if valid_dirs:
-                dir_enum, dx, dy = random.choice(valid_dirs)
+                dir_enum, dx, dy = self.rng.choice(valid_dirs)
                 self.direction = dir_enum
                 return (dx, dy)
         
@@ -230,16 +386,20 @@ class Ghost(Player):
             filtered_dirs = valid_dirs
         
         # Decide whether to follow Pacman or move randomly
-        if random.random() < self.follow_chance and len(filtered_dirs) > 0:
+        if self.rng.random() < self.follow_chance and len(filtered_dirs) > 0:
             # Follow Pacman - choose valid direction that gets us closer
             best_dir = None
             best_score = float('inf')
             
             for dir_enum, dx, dy in filtered_dirs:
-                # Calculate Manhattan distance to Pacman after this move
+                # Distance to Pacman after this move, Manhattan unless a
+                # precomputed maze distance field is set
                 new_x = self.rect.left + dx
                 new_y = self.rect.top + dy
-                dist = abs(new_x - pacman_pos[0]) + abs(new_y - pacman_pos[1])
+                if self.distance_field is not None:
+                    dist = self.distance_field.distance((new_x, new_y), pacman_pos)
+                else:
+                    dist = abs(new_x - pacman_pos[0]) + abs(new_y - pacman_pos[1])
                 
                 if dist < best_score:
                     best_score = dist
@@ -254,13 +414,13 @@ class Ghost(Player):
         for dir_enum, dx, dy in filtered_dirs:
             if dir_enum == self.direction:
                 # 70% chance to continue in same direction if valid
-                if random.random() < 0.7:
+                if self.rng.random() < 0.7:
                     return (dx, dy)
                 break
         
         # Need to choose a new direction
         if filtered_dirs:
-            dir_enum, dx, dy = random.choice(filtered_dirs)
+            dir_enum, dx, dy = self.rng.choice(filtered_dirs)
             self.direction = dir_enum
             return (dx, dy)
         
@@ -268,141 +428,191 @@ class Ghost(Player):
         return (0, 0)
 
 class PacmanGameAI:
-    def __init__(self):
-        self.screen = pygame.display.set_mode([606, 606])
-        pygame.display.set_caption('Pacman')
-        background = pygame.Surface(self.screen.get_size())
-        background = background.convert()
-        background.fill(black)
+    def __init__(self, headless=False, render_every=1, seed=None, maze_distance=False,
+                 maze=None):
+        # headless: no window, no drawing and no clock throttling
+        # render_every: only draw (and throttle) one step out of every N
+        # seed: seeds this game's own RNG, which drives all four ghosts
+        # maze_distance: ghosts chase Pacman by shortest path, not Manhattan distance
+        # maze: a Maze, or the name or path of one to load (see maze.py)
+        self.maze = as_maze(maze)
+        self.rng = random.Random(seed)
+        self.headless = headless
+        self.render_every = render_every
+        self.render_enabled = not headless
+        self.screen = None
+        self.renderer = None
+        if not headless:
+            self._open_display()
         self.clock = pygame.time.Clock()
-        self.reset()
+        self.wall_grid = self.maze.wall_grid
+        self.gate_grid = self.maze.gate_grid
 
-    def reset(self):
-        self.all_sprites_list = pygame.sprite.RenderPlain()
-        self.block_list = pygame.sprite.RenderPlain()
+        # Everything static is built once; reset() only restores mutable state
         self.monsta_list = pygame.sprite.RenderPlain()
-        self.pacman_collide = pygame.sprite.RenderPlain()
-        self.wall_list = setupRoomOne(self.all_sprites_list)
-        self.gate = self.gate_create(self.all_sprites_list)
-
-        self.pacman = Player( w, p_h, "images/Trollman.png" )
-        self.blinky = Ghost( w, b_h, "images/Blinky.png" )
-        self.pinky = Ghost( w, m_h, "images/Pinky.png" )
-        self.inky = Ghost( i_w, m_h, "images/Inky.png" )
-        self.clyde = Ghost( c_w, m_h, "images/Clyde.png" )
-
-
-        # Create the player paddle object
-        self.all_sprites_list.add(self.pacman)
-        self.pacman_collide.add(self.pacman) 
-        self.monsta_list.add(self.blinky)
-        self.all_sprites_list.add(self.blinky)
-        self.monsta_list.add(self.pinky)
-        self.all_sprites_list.add(self.pinky) 
-        self.monsta_list.add(self.inky)
-        self.all_sprites_list.add(self.inky)
-        self.monsta_list.add(self.clyde)
-        self.all_sprites_list.add(self.clyde)
-
-        # Draw the grid
-        self.grid()
+        self.wall_list, self.gate = static_sprites(self.maze)
+
+        maze = self.maze
+        self.pacman = Player( *maze.spawn('pacman'), "images/Trollman.png" )
+        self.blinky = Ghost( *maze.spawn('blinky'), "images/Blinky.png", self.rng )
+        self.pinky = Ghost( *maze.spawn('pinky'), "images/Pinky.png", self.rng )
+        self.inky = Ghost( *maze.spawn('inky'), "images/Inky.png", self.rng )
+        self.clyde = Ghost( *maze.spawn('clyde'), "images/Clyde.png", self.rng )
+        self.ghosts = (self.blinky, self.pinky, self.inky, self.clyde)
+        for ghost in self.ghosts:
+            ghost.spawn_exit_target = maze.spawn_exit_x
+            ghost.spawn_line_y = maze.spawn_line_y
+        if maze_distance:
+            # Imported here, distance.py builds its tables from this module
+            from .distance import ghost_distances
+            for ghost in self.ghosts:
+                ghost.distance_field = ghost_distances(self.maze)
+
+        # The ghosts are only grouped for _caught; Renderer draws every actor
+        self.monsta_list.add(self.ghosts)
+        self.reset()
+
+    def _open_display(self):
+        init_display()
+        self.screen = pygame.display.set_mode(self.maze.size)
+        pygame.display.set_caption('Pacman')
+        self.renderer = Renderer(self.screen, self.maze)
+
+    def set_render(self, enabled):
+        """Turn rendering on or off, e.g. to watch a single episode of a headless run"""
+        if enabled and self.screen is None:
+            self._open_display()
+        elif enabled and not self.render_enabled:
+            # The screen went stale while nothing was drawn
+            self.renderer.invalidate()
+        self.render_enabled = enabled
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+
+        for actor in (self.pacman, self.blinky, self.pinky, self.inky, self.clyde):
+            actor.respawn()
+
+        # 19x19 map of the pellets still on the board, indexed [row][column]
+        self.pellets = self.maze.pellets.copy()
+        self.pellets_left = int(self.pellets.sum())
 
         self.best_score = 0
         self.score = 0
         self.frame_iteration = 0
 
+    def get_snapshot(self):
+        """Capture the full game state, including the ghosts' RNG"""
+        actors = (self.pacman,) + self.ghosts
+        return GameSnapshot(
+            positions=tuple(actor.rect.topleft for actor in actors),
+            ghost_directions=tuple(ghost.direction.value for ghost in self.ghosts),
+            has_left_spawn=tuple(ghost.has_left_spawn for ghost in self.ghosts),
+            pellets=np.packbits(self.pellets).tobytes(),
+            pellets_left=self.pellets_left,
+            score=self.score,
+            best_score=self.best_score,
+            frame_iteration=self.frame_iteration,
+            rng_state=self.rng.getstate(),
+        )
+
+    def restore(self, snapshot):
+        """Put the game back in the state captured by get_snapshot()"""
+        actors = (self.pacman,) + self.ghosts
+        for actor, position in zip(actors, snapshot.positions):
+            actor.rect.topleft = position
+        for ghost, direction, left in zip(self.ghosts, snapshot.ghost_directions,
+                                          snapshot.has_left_spawn):
+            ghost.direction = Direction(direction)
+            ghost.has_left_spawn = left
+
+        packed = np.frombuffer(snapshot.pellets, dtype=np.uint8)
+        shape = self.maze.pellets.shape
+        self.pellets = np.unpackbits(packed, count=shape[0]*shape[1]).reshape(shape).astype(bool)
+        self.pellets_left = snapshot.pellets_left
+        self.score = snapshot.score
+        self.best_score = snapshot.best_score
+        self.frame_iteration = snapshot.frame_iteration
+        self.rng.setstate(snapshot.rng_state)
+
     def play_step(self, action):
+        # action is an index into [right, left, up, down] or its one-hot list.
+        # Each phase is its own method, so a Profiler can time them one by one.
         self.frame_iteration += 1
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
+        if self.screen is not None:
+            self._handle_events()
 
         # Make move
         self._move(action)
-
-        # Move ghosts - pass None for gate since ghosts can pass through
-        pacman_pos = [self.pacman.rect.left, self.pacman.rect.top]
-        dx, dy = self.pinky.choose_move(pacman_pos, self.wall_list, None)
-        self.pinky.move(dx, dy, self.wall_list, None)
-  
-        dx, dy = self.blinky.choose_move(pacman_pos, self.wall_list, None)
-        self.blinky.move(dx, dy, self.wall_list, None)
-  
-        dx, dy = self.inky.choose_move(pacman_pos, self.wall_list, None)
-        self.inky.move(dx, dy, self.wall_list, None)
-  
-        dx, dy = self.clyde.choose_move(pacman_pos, self.wall_list, None)
-        self.clyde.move(dx, dy, self.wall_list, None)
+        self._move_ghosts()
 
         game_over = False
         reward = 0
 
-        # Check if 'ate' food
-        blocks_hit_list = pygame.sprite.spritecollide(self.pacman, self.block_list, True)
-        # Check the list of collisions.
-        if len(blocks_hit_list) > 0:
-            self.score +=len(blocks_hit_list)
+        # Check if 'ate' food. Pacman moves on the 30px lattice through its spawn,
+        # where its rect covers exactly the one pellet cell [top//30][left//30].
+        if self._eat_pellet(self.pacman.rect.top // 30, self.pacman.rect.left // 30):
             reward += 10
         # Check if collided with ghosts
-        monsta_hit_list = pygame.sprite.spritecollide(self.pacman, self.monsta_list, False)
-        if monsta_hit_list:
+        if self._caught():
             game_over = True
             reward -= 10
             return reward, game_over, self.score   
 
-        # Update UI
-        self.screen.fill(black)
-        self.wall_list.draw(self.screen)
-        self.gate.draw(self.screen)
-        self.all_sprites_list.draw(self.screen)
-        self.monsta_list.draw(self.screen)
-        text=font.render("Score: "+str(self.score)+"/"+str(self.best_score), True, red)
-        self.screen.blit(text, [10, 10])
+        if self.render_enabled and self.frame_iteration % self.render_every == 0:
+            self._update_ui()
+
+        return reward, game_over, self.score
+
+    def _handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
 
-        pygame.display.flip()
+    def _move_ghosts(self):
+        # Move ghosts - pass None for gate since ghosts can pass through
+        pacman_pos = [self.pacman.rect.left, self.pacman.rect.top]
+        dx, dy = self.pinky.choose_move(pacman_pos, self.wall_grid, None)
+        self.pinky.move(dx, dy, self.wall_grid, None)
+  
+        dx, dy = self.blinky.choose_move(pacman_pos, self.wall_grid, None)
+        self.blinky.move(dx, dy, self.wall_grid, None)
+  
+        dx, dy = self.inky.choose_move(pacman_pos, self.wall_grid, None)
+        self.inky.move(dx, dy, self.wall_grid, None)
+  
+        dx, dy = self.clyde.choose_move(pacman_pos, self.wall_grid, None)
+        self.clyde.move(dx, dy, self.wall_grid, None)
+
+    def _caught(self):
+        return bool(pygame.sprite.spritecollide(self.pacman, self.monsta_list, False))
+
+    def _update_ui(self):
+        self.renderer.draw(self)
+        self._tick()
+
+    def _tick(self):
         self.clock.tick(SPEED)
 
-        return reward, game_over, self.score
 
+    def _eat_pellet(self, row, column):
+        # Take the pellet at [row, column] off the board, if it is still there
+        if not self.pellets[row, column]:
+            return False
+        self.pellets[row, column] = False
+        self.pellets_left -= 1
+        self.score += 1
+        return True
 
     def _move(self, action):
-        # [right, left, up ,down]
-        if action == [1, 0, 0, 0]:
-            self.pacman.move(30, 0, self.wall_list, self.gate)
-        elif action == [0, 1, 0, 0]:
-            self.pacman.move(-30, 0, self.wall_list, self.gate)
-        elif action == [0, 0, 1, 0]:
-            self.pacman.move(0, 30, self.wall_list, self.gate)
-        elif action == [0, 0, 0, 1]:
-            self.pacman.move(0, -30, self.wall_list, self.gate)
-
-    def grid(self):
-        for row in range(19):
-            for column in range(19):
-                if (row == 7 or row == 8) and (column == 8 or column == 9 or column == 10):
-                    continue
-                else:
-                    block = Block(yellow, 4, 4)
-
-                    # Set a random location for the block
-                    block.rect.x = (30*column+6)+26
-                    block.rect.y = (30*row+6)+26
-
-                    b_collide = pygame.sprite.spritecollide(block, self.wall_list, False)
-                    p_collide = pygame.sprite.spritecollide(block, self.pacman_collide, False)
-                    if b_collide:
-                      continue
-                    elif p_collide:
-                      continue
-                    else:
-                        # Add the block to the list of objects
-                        self.block_list.add(block)
-                        self.all_sprites_list.add(block)
-
-    def gate_create(self, all_sprites_list):
-        gate = pygame.sprite.RenderPlain()
-        gate.add(Wall(282,242,42,2,white))
-        all_sprites_list.add(gate)
-        return gate
-
+        # [right, left, up ,down], as an index or a one-hot list
+        if not isinstance(action, (int, np.integer)):
+            action = one_hot_actions.get(tuple(action))
+            if action is None:
+                return
+        elif not 0 <= action < 4:
+            return
+        dx, dy = action_deltas[action]
+        self.pacman.move(dx, dy, self.wall_grid, self.gate_grid)
@@ -0,0 +1,182 @@
+"""Per-phase timers and counters for the game, the agent and training.
+
+A Profiler wraps chosen methods of chosen objects with timed versions,
+by setting instance attributes that shadow the class methods. Nothing
+is wrapped until attach() is called and detach() restores the originals,
+so an unprofiled game or agent runs exactly the code it always did.
+"""
+import json
+import os
+import time
+from collections import defaultdict
+from functools import wraps
+
+import numpy as np
+
+# Methods PacmanGameAI.play_step runs through, in order
+GAME_PHASES = ('_handle_events', '_move', '_move_ghosts', '_eat_pellet', '_caught',
+               '_update_ui', '_tick')
+
+
+class Profiler:
+    """Aggregates wall time and call counts per phase, plus free-form counters.
+
+    path, if given, is where maybe_export() writes a snapshot every interval
+    seconds: appended as one JSON line, or, for a path ending in '.prom',
+    rewritten as a Prometheus text exposition file.
+    """
+
+    def __init__(self, path=None, interval=10.0, max_episodes=10_000):
+        self.path = path
+        self.interval = interval
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        # Lengths of the most recent episodes, in a fixed ring
+        self.episode_lengths = np.zeros(max_episodes, dtype=np.int64)
+        self.n_episodes = 0
+        # Over every episode, not just those still in the ring
+        self.total_episode_length = 0
+        self._attached = []
+
+        self.started = self._last_export = time.perf_counter()
+        self._last_counters = {}
+
+    def timed(self, name, fn):
+        """fn wrapped to add its wall time and a call to phase name"""
+        seconds, calls, clock = self.seconds, self.calls, time.perf_counter
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+        return wrapper
+
+    def attach(self, obj, methods, prefix=''):
+        """Time each of obj's methods as phase prefix + method name"""
+        for method in methods:
+            original = getattr(obj, method)
+            setattr(obj, method, self.timed(prefix + method.lstrip('_'), original))
+            self._attached.append((obj, method))
+        return obj
+
+    def detach(self):
+        """Drop every wrapper, leaving the objects as they were"""
+        for obj, method in reversed(self._attached):
+            obj.__dict__.pop(method, None)
+        self._attached = []
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add_episode(self, length):
+        self.episode_lengths[self.n_episodes % len(self.episode_lengths)] = length
+        self.n_episodes += 1
+        self.total_episode_length += length
+
+    def snapshot(self):
+        """Everything measured so far, with rates since the previous snapshot"""
+        now = time.perf_counter()
+        elapsed = max(now - self._last_export, 1e-9)
+        rates = {f'{name}_per_second': (value - self._last_counters.get(name, 0)) / elapsed
+                 for name, value in self.counters.items()}
+        self._last_export = now
+        self._last_counters = dict(self.counters)
+
+        lengths = self.episode_lengths[:min(self.n_episodes, len(self.episode_lengths))]
+        return {
+            'time': time.time(),
+            'uptime': now - self.started,
+            'phases': {name: {'seconds': self.seconds[name], 'calls': self.calls[name],
+                              'mean_us': 1e6 * self.seconds[name] / self.calls[name]}
+                       for name in self.seconds if self.calls[name]},
+            'counters': dict(self.counters),
+            'rates': rates,
+            'episodes': {
+                'count': self.n_episodes,
+                'total_length': self.total_episode_length,
+                'mean_length': float(lengths.mean()) if len(lengths) else 0.,
+                'p50_length': float(np.percentile(lengths, 50)) if len(lengths) else 0.,
+                'p99_length': float(np.percentile(lengths, 99)) if len(lengths) else 0.,
+            },
+        }
+
+    def maybe_export(self):
+        """Export a snapshot if interval seconds passed since the last one"""
+        if self.path is not None and time.perf_counter() - self._last_export >= self.interval:
+            self.export()
+
+    def export(self, path=None):
+        path = path or self.path
+        snapshot = self.snapshot()
+        if path.endswith('.prom'):
+            # Scrapers may read at any moment, so replace the file in one go
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(prometheus_text(snapshot))
+            os.replace(tmp, path)
+        else:
+            with open(path, 'a') as f:
+                f.write(json.dumps(snapshot) + '\n')
+        return snapshot
+
+
+def prometheus_text(snapshot, prefix='pacman'):
+    """A Profiler snapshot in the Prometheus text exposition format"""
+    lines = [f'# TYPE {prefix}_phase_seconds_total counter']
+    lines += [f'{prefix}_phase_seconds_total{{phase="{name}"}} {phase["seconds"]:.9g}'
+              for name, phase in snapshot['phases'].items()]
+    lines.append(f'# TYPE {prefix}_phase_calls_total counter')
+    lines += [f'{prefix}_phase_calls_total{{phase="{name}"}} {phase["calls"]}'
+              for name, phase in snapshot['phases'].items()]
+    lines.append(f'# TYPE {prefix}_events_total counter')
+    lines += [f'{prefix}_events_total{{event="{name}"}} {value}'
+              for name, value in snapshot['counters'].items()]
+    lines.append(f'# TYPE {prefix}_rate gauge')
+    lines += [f'{prefix}_rate{{rate="{name}"}} {value:.9g}'
+              for name, value in snapshot['rates'].items()]
+    episodes = snapshot['episodes']
+    lines.append(f'# TYPE {prefix}_episode_length summary')
+    lines.append(f'{prefix}_episode_length{{quantile="0.5"}} {episodes["p50_length"]:.9g}')
+    lines.append(f'{prefix}_episode_length{{quantile="0.99"}} {episodes["p99_length"]:.9g}')
+    lines.append(f'{prefix}_episode_length_sum {episodes["total_length"]}')
+    lines.append(f'{prefix}_episode_length_count {episodes["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def profile_game(profiler, game):
+    """Time a PacmanGameAI's play_step, each of its phases and reset()"""
+    profiler.attach(game, GAME_PHASES, 'game.')
+    for ghost in game.ghosts:
+        profiler.attach(ghost, ('choose_move', 'move'), 'ghost.')
+    profiler.attach(game.pacman, ('move',), 'pacman.')
+
+    play_step = profiler.timed('game.play_step', game.play_step)
+    reset = profiler.timed('game.reset', game.reset)
+
+    def counted_play_step(action):
+        profiler.counters['steps'] += 1
+        return play_step(action)
+
+    def counted_reset(*args, **kwargs):
+        if game.frame_iteration:
+            profiler.add_episode(game.frame_iteration)
+        profiler.counters['resets'] += 1
+        return reset(*args, **kwargs)
+
+    game.play_step = counted_play_step
+    game.reset = counted_reset
+    profiler._attached += [(game, 'play_step'), (game, 'reset')]
+    return game
+
+
+def profile_agent(profiler, agent):
+    """Time an Agent's state encoding, action choice, training and replay sampling"""
+    profiler.attach(agent, ('get_state', 'get_action'), 'agent.')
+    profiler.attach(agent.trainer, ('train_step',), 'trainer.')
+    profiler.attach(agent.memory, ('sample',), 'replay.')
+    return agent
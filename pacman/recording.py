@@ -0,0 +1,249 @@
+"""Compact, append-only recordings of played episodes.
+
+A recording is a data file and an index file next to it (path + '.idx').
+The data file starts with FILE_MAGIC and then holds, per episode, one
+EPISODE_DTYPE header followed by n_steps STEP_DTYPE records. A step stores
+the action, the five actors as (column, row) tiles of their 30px lattice,
+the reward, whether Pacman ate a pellet and whether the game ended, 14
+bytes in all. Each actor's
+offset within its tile never changes, so tiles map back to exact pixels.
+
+The index holds one INDEX_DTYPE entry per finished episode. Episodes are
+written whole when they end, so a crash loses at most the episode in
+progress; the reader rebuilds the index from the headers if the two files
+disagree. Steps are read straight out of a memory map, without copies.
+"""
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from .maze import as_maze
+from .pacman import PacmanGameAI, one_hot_actions
+
+FILE_MAGIC = b'PACREC\x00\x01'
+EPISODE_MAGIC = b'EPIS'
+
+STEP_DTYPE = np.dtype([('action', 'i1'), ('tiles', 'u1', (5, 2)),
+                       ('reward', 'i1'), ('ate', '?'), ('done', '?')])
+EPISODE_DTYPE = np.dtype([('magic', 'S4'), ('n_steps', '<u4'), ('seed', '<i8'),
+                          ('score', '<i4'), ('reserved', '<u4')])
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('n_steps', '<u4'), ('seed', '<i8'),
+                        ('score', '<i4')])
+
+Episode = namedtuple('Episode', ['index', 'seed', 'score', 'steps'])
+
+
+def _episode_end(offset, n_steps):
+    return int(offset) + EPISODE_DTYPE.itemsize + int(n_steps) * STEP_DTYPE.itemsize
+
+
+def pixel_positions(steps, offsets=None):
+    """(n_steps, 5, 2) pixel (x, y) positions of Pacman and the ghosts.
+
+    offsets are the actors' offsets within their tiles, maze.spawns % 30,
+    room one's by default.
+    """
+    if offsets is None:
+        offsets = as_maze(None).spawns % 30
+    return steps['tiles'].astype(np.int64) * 30 + offsets
+
+
+class EpisodeWriter:
+    """Appends episodes to a recording, creating it if needed.
+
+    Call begin_episode(), then record() after every play_step() (or
+    add_step() with raw values), then end_episode(). Steps are buffered in
+    a preallocated array and written with the episode header in one go.
+    """
+
+    def __init__(self, path, max_steps=10_000):
+        self.path = path
+        self.n_episodes = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with EpisodeReader(path) as reader:
+                self.n_episodes = len(reader)
+                end = reader.end
+                index = reader.index
+            # Cut off an episode a crash left half written, so appends line up
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+            index.tofile(path + '.idx')
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(FILE_MAGIC)
+            open(path + '.idx', 'wb').close()
+        self.index_file = open(path + '.idx', 'ab')
+
+        self.steps = np.zeros(max_steps, dtype=STEP_DTYPE)
+        self.n_steps = 0
+        self.seed = -1
+        self.score = 0
+
+    def begin_episode(self, seed=None):
+        self.n_steps = 0
+        self.seed = -1 if seed is None else seed
+        self.score = 0
+
+    def add_step(self, action, tiles, reward, ate, done):
+        if self.n_steps == len(self.steps):
+            self.steps = np.concatenate([self.steps, np.zeros_like(self.steps)])
+        step = self.steps[self.n_steps]
+        step['action'] = action
+        step['tiles'] = tiles
+        step['reward'] = reward
+        step['ate'] = ate
+        step['done'] = done
+        self.n_steps += 1
+
+    def record(self, game, action, reward, done):
+        """Record the step a PacmanGameAI just played"""
+        if not isinstance(action, (int, np.integer)):
+            action = one_hot_actions.get(tuple(action), -1)
+        tiles = [(actor.rect.left // 30, actor.rect.top // 30)
+                 for actor in (game.pacman,) + game.ghosts]
+        # Only a pellet raises the score
+        ate = game.score != self.score
+        self.score = game.score
+        self.add_step(action, tiles, reward, ate, done)
+
+    def end_episode(self, score=None):
+        """Write the episode out, returning its number in the recording"""
+        if score is not None:
+            self.score = score
+        offset = self.file.tell()
+        header = np.array([(EPISODE_MAGIC, self.n_steps, self.seed, self.score, 0)],
+                          dtype=EPISODE_DTYPE)
+        self.file.write(header.tobytes())
+        self.file.write(self.steps[:self.n_steps].tobytes())
+        self.file.flush()
+        entry = np.array([(offset, self.n_steps, self.seed, self.score)], dtype=INDEX_DTYPE)
+        self.index_file.write(entry.tobytes())
+        self.index_file.flush()
+        self.n_episodes += 1
+        self.n_steps = 0
+        return self.n_episodes - 1
+
+    def close(self):
+        self.file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EpisodeReader:
+    """Random access to the episodes of a recording, through a memory map.
+
+    reader.index is the INDEX_DTYPE array of every episode (offset, length,
+    seed and final score), so episodes can be picked out without touching
+    their steps. reader[i] is an Episode whose steps are a read-only view
+    into the map.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        size = os.path.getsize(path)
+        self.data = np.memmap(path, dtype=np.uint8, mode='r') if size else np.zeros(0, np.uint8)
+        if bytes(self.data[:len(FILE_MAGIC)]) != FILE_MAGIC:
+            raise ValueError(f'{path} is not an episode recording')
+        self.index = self._load_index()
+
+    def _load_index(self):
+        index_path = self.path + '.idx'
+        if os.path.exists(index_path):
+            self.index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+            if self.end == len(self.data):
+                return self.index
+        return self._scan()
+
+    def _scan(self):
+        # Walk the episode headers, stopping at the first incomplete episode
+        entries = []
+        offset = len(FILE_MAGIC)
+        while offset + EPISODE_DTYPE.itemsize <= len(self.data):
+            header = self.data[offset:offset + EPISODE_DTYPE.itemsize].view(EPISODE_DTYPE)[0]
+            end = _episode_end(offset, header['n_steps'])
+            if header['magic'] != EPISODE_MAGIC or end > len(self.data):
+                break
+            entries.append((offset, header['n_steps'], header['seed'], header['score']))
+            offset = end
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    @property
+    def end(self):
+        """Size of the file up to the end of its last complete episode"""
+        if not len(self.index):
+            return len(FILE_MAGIC)
+        return _episode_end(self.index[-1]['offset'], self.index[-1]['n_steps'])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        entry = self.index[i]
+        start = int(entry['offset']) + EPISODE_DTYPE.itemsize
+        stop = start + int(entry['n_steps']) * STEP_DTYPE.itemsize
+        steps = self.data[start:stop].view(STEP_DTYPE)
+        return Episode(int(i) % len(self), int(entry['seed']), int(entry['score']), steps)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(episode, game=None, render=False):
+    """Play a recorded episode back on a PacmanGameAI, yielding each step.
+
+    The actors are put where the recording says, nothing is simulated, so
+    a headless replay runs as fast as the steps can be read. render=True
+    draws every step in the game window at the game's speed.
+    """
+    if game is None:
+        game = PacmanGameAI(headless=not render)
+    game.reset(seed=episode.seed if episode.seed >= 0 else None)
+    game.set_render(render)
+    actors = (game.pacman,) + game.ghosts
+    offsets = game.maze.spawns % 30
+    for step, positions in zip(episode.steps, pixel_positions(episode.steps, offsets)):
+        game.frame_iteration += 1
+        for actor, (x, y) in zip(actors, positions.tolist()):
+            actor.rect.topleft = (x, y)
+        if step['ate']:
+            game._eat_pellet(positions[0, 1] // 30, positions[0, 0] // 30)
+        if render:
+            pygame.event.pump()
+            game._update_ui()
+        yield step
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='List or replay recorded episodes')
+    parser.add_argument('path')
+    parser.add_argument('--episode', type=int, help='replay this episode')
+    parser.add_argument('--render', action='store_true', help='show the replay in a window')
+    args = parser.parse_args()
+
+    with EpisodeReader(args.path) as reader:
+        if args.episode is None:
+            for i, entry in enumerate(reader.index):
+                print(f'{i:6d} | steps: {entry["n_steps"]:6d} | score: {entry["score"]:4d} | '
+                      f'seed: {entry["seed"]}')
+        else:
+            for _ in replay(reader[args.episode], render=args.render):
+                pass
@@ -0,0 +1,178 @@
+import numpy as np
+
+from .collision import TILE
+from .distance import ghost_distances
+from .maze import as_maze
+
+STATE_SIZE = 33
+
+# Planes of a GridEncoder observation, one per channel in this order
+GRID_CHANNELS = ('walls', 'pellets', 'pacman', 'blinky', 'pinky', 'inky', 'clyde', 'gate')
+
+# Staying put, then the candidate moves in valid-directions-mask order:
+# RIGHT, LEFT, UP, DOWN
+DELTAS = np.array([[0, 0], [30, 0], [-30, 0], [0, -30], [0, 30]])
+WINDOW_OFFSETS = np.arange(5)
+
+
+class StateEncoder:
+    """Agent.get_state's 33 features computed with NumPy.
+
+    The layout matches Agent.get_state value for value: the valid directions
+    mask, the four safety scores and the 5x5 food window around Pacman.
+    encode_batch() works on whole arrays of games, e.g. a BatchedPacmanEnv's
+    pacman, ghosts and pellets; encode() reads one PacmanGameAI.
+    Results are written to a preallocated buffer that is reused on every call.
+    With maze_distance=True the safety scores measure ghost distances along
+    the maze (distance.ghost_distances) rather than as the crow flies.
+    maze is a Maze or the name of one, room one by default.
+    """
+
+    def __init__(self, n_games=1, dtype=np.float64, maze_distance=False, maze=None):
+        maze = as_maze(maze)
+        self.walls = maze.blocked[0]
+        self.distance_field = ghost_distances(maze) if maze_distance else None
+        self.buffer = np.zeros((n_games, STATE_SIZE), dtype=dtype)
+        # Pellet maps with a 2 cell border of empty cells, so windows never clip
+        self.padded_shape = (maze.pellets.shape[0] + 4, maze.pellets.shape[1] + 4)
+        self.padded = np.zeros((n_games,) + self.padded_shape, dtype=bool)
+        self._pacman = np.zeros((1, 2), dtype=np.int64)
+        self._ghosts = np.zeros((1, 4, 2), dtype=np.int64)
+
+    def encode(self, game, out=None):
+        self._pacman[0] = game.pacman.rect.topleft
+        for i, ghost in enumerate((game.blinky, game.pinky, game.inky, game.clyde)):
+            self._ghosts[0, i] = ghost.rect.topleft
+        state = self.encode_batch(self._pacman, self._ghosts, game.pellets[None])[0]
+        if out is not None:
+            out[:] = state
+            return out
+        return state
+
+    def encode_batch(self, pacman, ghosts, pellets):
+        """(N, 33) states for (N, 2) Pacman, (N, 4, 2) ghost and (N, 19, 19) pellet arrays"""
+        n = len(pacman)
+        if len(self.buffer) < n:
+            self.buffer = np.zeros((n, STATE_SIZE), dtype=self.buffer.dtype)
+            self.padded = np.zeros((n,) + self.padded_shape, dtype=bool)
+        out = self.buffer[:n]
+        padded = self.padded[:n]
+
+        # Valid directions mask
+        points = pacman[:, None, :] + DELTAS
+        targets = points[:, 1:]
+        valid = ~self.walls[targets[..., 1] // TILE + 1, targets[..., 0] // TILE + 1]
+        out[:, 0:4] = valid
+
+        # Safety scores: the worst change in distance to any ghost, per move.
+        # Distances from the current and the four next positions in one go.
+        if self.distance_field is not None:
+            # In pixels, so a step still changes the distance by TILE
+            moves = self.distance_field.distance(points[:, :, None, :], ghosts[:, None, :, :])
+            distance = moves * float(TILE)
+        else:
+            distance = np.sqrt(((points[:, :, None, :] - ghosts[:, None, :, :]) ** 2).sum(axis=3))
+        safety = ((distance[:, 1:] - distance[:, :1]).min(axis=2) + 30) / 60
+        out[:, 4:8] = np.where(valid, safety, 0.)
+
+        # 5x5 food window, zero off the board. Pacman stays on the lattice
+        # through its spawn, so the pellet under it is at [y // TILE, x // TILE],
+        # which is [y // TILE + 2, x // TILE + 2] in the padded map.
+        padded[:, 2:-2, 2:-2] = pellets
+        if n == 1:
+            row, col = pacman[0, 1] // TILE, pacman[0, 0] // TILE
+            out[0, 8:] = padded[0, row:row + 5, col:col + 5].ravel()
+        else:
+            rows = pacman[:, 1:2] // TILE + WINDOW_OFFSETS
+            cols = pacman[:, 0:1] // TILE + WINDOW_OFFSETS
+            food = padded[np.arange(n)[:, None, None], rows[:, :, None], cols[:, None, :]]
+            out[:, 8:] = food.reshape(n, 25)
+        return out
+
+
+class GridEncoder:
+    """The whole board as one plane per GRID_CHANNELS entry, on the pellet grid.
+
+    Cell [row, col] of every plane is the tile at [y // TILE, x // TILE],
+    19x19 in room one, and holds 1 where the tile is a wall, has a pellet,
+    has that actor on it or is the gate. Everything is read from the game
+    state, nothing is drawn. The walls and the gate are written once;
+    each call only rewrites the pellet plane and the five actor cells.
+
+    frames=k stacks the last k observations, oldest first, into
+    (k * channels, rows, cols). Frames live in a ring of 2k slots, each
+    new frame written to slot i and its mirror i + k, so the last k frames
+    are always the contiguous slots i + 1 to i + k and the stack is a view
+    of the ring: nothing is ever shifted or copied to build it. The first
+    frame after reset() fills the whole stack of those games.
+
+    encode() and encode_batch() return views into buffers overwritten by
+    the next call; copy them to keep them.
+    """
+
+    def __init__(self, n_games=1, frames=1, dtype=np.float32, maze=None):
+        maze = as_maze(maze)
+        self.frames = frames
+        rows, cols = maze.pellets.shape
+        self.shape = (frames * len(GRID_CHANNELS), rows, cols)
+        self.static = np.zeros((len(GRID_CHANNELS), rows, cols), dtype=dtype)
+        # The tables carry a one tile margin, and tiles past the pellet grid
+        # are outer wall that no actor reaches
+        self.static[0] = maze.blocked[0][1:rows + 1, 1:cols + 1]
+        self.static[-1] = maze.gate_blocked[1:rows + 1, 1:cols + 1]
+        self.ring = np.zeros((n_games, 2 * frames if frames > 1 else 1) + self.static.shape,
+                             dtype=dtype)
+        self.ring[:] = self.static
+        self.position = 0
+        self.pending = np.ones(n_games, dtype=bool)
+
+    def reset(self, mask=None):
+        """Start new stacks, for every game or only where mask is True"""
+        if mask is None:
+            self.pending[:] = True
+        else:
+            self.pending |= mask
+
+    def encode(self, game):
+        frame = self._next_frame(1)[0]
+        frame[1] = game.pellets
+        frame[2:7] = 0
+        # Plain indexing, a single game is too small for fancy indexing to pay
+        rows, cols = self.shape[1] - 1, self.shape[2] - 1
+        for channel, actor in enumerate((game.pacman,) + game.ghosts, start=2):
+            x, y = actor.rect.topleft
+            frame[channel, min(y // TILE, rows), min(x // TILE, cols)] = 1
+        return self._stack(1)[0]
+
+    def encode_batch(self, pacman, ghosts, pellets):
+        """(N, frames * channels, rows, cols) observations of N games"""
+        n = len(pacman)
+        frame = self._next_frame(n)
+        frame[:, 1] = pellets
+        frame[:, 2:7] = 0
+        # Actors stay on their 30px lattices, one tile each
+        actors = np.concatenate([pacman[:, None, :], ghosts], axis=1)
+        rows = np.clip(actors[..., 1] // TILE, 0, self.shape[1] - 1)
+        cols = np.clip(actors[..., 0] // TILE, 0, self.shape[2] - 1)
+        frame[np.arange(n)[:, None], np.arange(2, 7), rows, cols] = 1
+        return self._stack(n)
+
+    def _next_frame(self, n):
+        # The slot the next frame of the first n games goes to
+        if self.frames == 1:
+            return self.ring[:n, 0]
+        self.position = (self.position + 1) % self.frames
+        return self.ring[:n, self.position + self.frames]
+
+    def _stack(self, n):
+        k = self.frames
+        if k == 1:
+            self.pending[:n] = False
+            return self.ring[:n, 0]
+        self.ring[:n, self.position] = self.ring[:n, self.position + k]
+        pending = self.pending[:n]
+        if pending.any():
+            self.ring[:n][pending] = self.ring[:n, self.position + k][pending][:, None]
+            pending[:] = False
+        stack = self.ring[:n, self.position + 1:self.position + 1 + k]
+        return stack.reshape((n,) + self.shape)
@@ -0,0 +1,173 @@
+import numpy as np
+import torch
+
+
+class ReplayBuffer:
+    """Ring buffer of transitions stored in preallocated NumPy arrays.
+
+    sample() gathers straight into reusable batch arrays and hands them out
+    as tensors sharing that memory, so sampling allocates nothing. The
+    tensors are overwritten by the next sample() call; copy them if they
+    need to outlive it.
+    """
+
+    def __init__(self, capacity, state_size, batch_size=None):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng()
+        self._batch = None
+        if batch_size is not None:
+            self._allocate_batch(batch_size)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.states, self.next_states, self.actions,
+                                      self.rewards, self.dones))
+
+    def push(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self._advance(1)
+        return i
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions, e.g. a TransitionBatch from a worker"""
+        n = len(actions)
+        indices = (self.position + np.arange(n)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+        self._advance(n)
+        return indices
+
+    def _advance(self, n):
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def _allocate_batch(self, batch_size):
+        self._batch = (
+            np.empty((batch_size, self.states.shape[1]), dtype=np.float32),
+            np.empty(batch_size, dtype=np.int64),
+            np.empty(batch_size, dtype=np.float32),
+            np.empty((batch_size, self.states.shape[1]), dtype=np.float32),
+            np.empty(batch_size, dtype=bool),
+        )
+        self._batch_tensors = tuple(torch.from_numpy(a) for a in self._batch)
+
+    def gather(self, indices):
+        """(states, actions, rewards, next_states, dones) tensors for indices"""
+        if self._batch is None or len(self._batch[1]) != len(indices):
+            self._allocate_batch(len(indices))
+        states, actions, rewards, next_states, dones = self._batch
+        np.take(self.states, indices, axis=0, out=states)
+        np.take(self.actions, indices, out=actions)
+        np.take(self.rewards, indices, out=rewards)
+        np.take(self.next_states, indices, axis=0, out=next_states)
+        np.take(self.dones, indices, out=dones)
+        return self._batch_tensors
+
+    def sample(self, batch_size):
+        batch_size = min(batch_size, self.size)
+        indices = self.rng.integers(0, self.size, batch_size)
+        return self.gather(indices)
+
+
+class SumTree:
+    """Binary tree of priorities where each node holds the sum of its children.
+
+    Leaves live at [capacity, 2 * capacity). Updating a priority and finding
+    the leaf for a prefix sum both walk one root-to-leaf path, O(log n), and
+    both are done for a whole batch of indices at once.
+    """
+
+    def __init__(self, capacity):
+        # Round up to a power of two so every level is full
+        self.capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices, dtype=np.int64) + self.capacity
+        if len(nodes) == 0:
+            return
+        self.tree[nodes] = priorities
+        # Leaves are all at the same depth, so every node of a level reaches
+        # the root together. Recompute parents from both children so that
+        # repeated indices in one update stay exact.
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, prefix_sums):
+        """Leaf index whose cumulative priority range contains each prefix sum"""
+        nodes = np.ones(len(prefix_sums), dtype=np.int64)
+        prefix_sums = np.array(prefix_sums, dtype=np.float64)
+        while nodes[0] < self.capacity:
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            go_right = prefix_sums >= left_sums
+            prefix_sums -= np.where(go_right, left_sums, 0)
+            nodes = left + go_right
+        return nodes - self.capacity
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """ReplayBuffer sampling transitions in proportion to priority ** alpha.
+
+    New transitions get the largest priority seen so far. sample() returns
+    the batch plus the sampled indices and importance-sampling weights;
+    feed the new TD errors back through update_priorities(indices, errors).
+    """
+
+    def __init__(self, capacity, state_size, batch_size=None, alpha=0.6, beta=0.4, eps=1e-5):
+        super().__init__(capacity, state_size, batch_size)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def push(self, state, action, reward, next_state, done):
+        i = super().push(state, action, reward, next_state, done)
+        self.tree.update([i], self.max_priority ** self.alpha)
+        return i
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        indices = super().push_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(indices, self.max_priority ** self.alpha)
+        return indices
+
+    def sample(self, batch_size):
+        batch_size = min(batch_size, self.size)
+        # One draw from each of batch_size equal slices of the total priority
+        segment = self.tree.total / batch_size
+        prefix_sums = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = np.minimum(self.tree.find(prefix_sums), self.size - 1)
+
+        probabilities = self.tree.tree[indices + self.tree.capacity] / self.tree.total
+        weights = (self.size * probabilities) ** -self.beta
+        weights /= weights.max()
+        return self.gather(indices), indices, torch.from_numpy(weights.astype(np.float32))
+
+    def update_priorities(self, indices, errors):
+        priorities = np.abs(np.asarray(errors, dtype=np.float64)) + self.eps
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.update(indices, priorities ** self.alpha)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from pacman.batch_env import BatchedPacmanEnv
+from pacman.pacman import PacmanGameAI, Direction
+
+DIRECTION_INDEX = {Direction.RIGHT: 0, Direction.LEFT: 1, Direction.DOWN: 2, Direction.UP: 3}
+
+
+class AlignedRandom:
+    """Feeds one ghost the same uniforms BatchedPacmanEnv uses for it"""
+
+    def __init__(self, ghost_index):
+        self.ghost_index = ghost_index
+        self.ghost = None
+        self.u = None
+        self.calls = 0
+
+    def begin_step(self, u):
+        self.u = u
+        self.calls = 0
+
+    def random(self):
+        # First draw is the follow chance, the second the keep-straight chance
+        value = self.u[self.calls, 0, self.ghost_index]
+        self.calls += 1
+        return value
+
+    def choice(self, seq):
+        # Spawn moves use the fourth row of draws, wandering the third
+        row = 2 if self.ghost.has_left_spawn else 3
+        return seq[int(self.u[row, 0, self.ghost_index] * len(seq))]
+
+
+@pytest.mark.parametrize('maze_distance', [False, True])
+@pytest.mark.parametrize('seed', range(30))
+def test_matches_python_game_with_aligned_draws(seed, maze_distance):
+    env = BatchedPacmanEnv(1, seed=seed, maze_distance=maze_distance)
+    game = PacmanGameAI(headless=True, maze_distance=maze_distance)
+    rngs = []
+    for i, ghost in enumerate(game.ghosts):
+        ghost.rng = AlignedRandom(i)
+        ghost.rng.ghost = ghost
+        rngs.append(ghost.rng)
+
+    actions = np.random.default_rng(seed + 1000)
+    for _ in range(500):
+        action = int(actions.integers(4))
+        # Peek at the draws the env is about to make
+        state = env.rng.bit_generator.state
+        u = env.rng.random((4, 1, 4))
+        env.rng.bit_generator.state = state
+        for rng in rngs:
+            rng.begin_step(u)
+
+        expected = game.play_step(action)
+        rewards, dones, scores = env.step(np.array([action]))
+        assert expected == (rewards[0], dones[0], scores[0])
+        if expected[1]:
+            break
+        assert tuple(env.pacman[0]) == game.pacman.rect.topleft
+        assert [tuple(p) for p in env.ghosts[0]] == [g.rect.topleft for g in game.ghosts]
+        assert list(env.ghost_directions[0]) == [DIRECTION_INDEX[g.direction] for g in game.ghosts]
+        assert (env.pellets[0] == game.pellets).all()
+
+
+def test_one_hot_actions_and_auto_reset():
+    env = BatchedPacmanEnv(64, seed=0)
+    one_hot = np.eye(4, dtype=np.int64)[np.zeros(64, dtype=np.int64)]
+    one_hot[0] = 0  # not a one-hot, Pacman stays put
+    start = env.pacman.copy()
+    env.step(one_hot)
+    assert tuple(env.pacman[0]) == tuple(start[0])
+
+    actions = np.random.default_rng(1)
+    finished = 0
+    for _ in range(400):
+        rewards, dones, scores = env.step(actions.integers(0, 4, 64))
+        finished += dones.sum()
+        assert (env.scores[dones] == 0).all()
+        assert (env.frame_iterations[dones] == 0).all()
+    assert finished > 0
@@ -0,0 +1,33 @@
+import math
+
+from benchmarks import (bench_collision, bench_env, bench_inference, bench_replay,
+                        bench_reset, bench_state, bench_train, bench_workers)
+from benchmarks.run import flatten, lower_is_better
+
+
+def test_every_benchmark_reports_numbers():
+    results = {
+        'env': bench_env.run(0.01),
+        'reset': bench_reset.run(0.01),
+        'state': bench_state.run(0.01, n_games=16),
+        'collision': bench_collision.run(0.01),
+        'replay': bench_replay.run(1000, 100, 2),
+        'train': bench_train.run(0.01, batch_size=32),
+        'inference': bench_inference.run(0.01, 0.001, batch_sizes=[1, 8]),
+        'workers': bench_workers.run(0.01, worker_counts=[1, 2], batch_size=16),
+    }
+    metrics = flatten(results)
+    assert 'env.headless.steps_per_s' in metrics
+    assert 'inference.batch_8.p99_ms' in metrics
+    assert metrics['workers.workers_1.speedup'] == 1.
+    assert all(math.isfinite(value) and value >= 0 for value in metrics.values())
+
+
+def test_compare_directions():
+    assert lower_is_better('state.encode.us')
+    assert lower_is_better('state.encode_batch_1024.per_state_us')
+    assert lower_is_better('state.grid_batch_1024.per_state_us')
+    assert lower_is_better('inference.batch_8.p99_ms')
+    assert lower_is_better('replay.buffer.memory_mb')
+    assert not lower_is_better('env.headless.steps_per_s')
+    assert not lower_is_better('workers.workers_2.speedup')
@@ -0,0 +1,43 @@
+import random
+
+import pygame
+import pytest
+
+from pacman.collision import CollisionGrid
+from pacman.maze import load_maze
+from pacman.pacman import PacmanGameAI
+
+
+def positions(game):
+    actors = (game.pacman, game.blinky, game.pinky, game.inky, game.clyde)
+    return [tuple(actor.rect) for actor in actors] + [
+        (ghost.direction, ghost.has_left_spawn) for ghost in game.ghosts]
+
+
+def test_collides_matches_collidelist():
+    maze = load_maze()
+    wall_grid = CollisionGrid(maze.walls)
+    walls = [pygame.Rect(r) for r in maze.walls]
+    rng = random.Random(0)
+    for _ in range(50_000):
+        rect = pygame.Rect(rng.randrange(-100, 700), rng.randrange(-100, 700),
+                           rng.choice([4, 10, 32]), rng.choice([4, 10, 32]))
+        assert wall_grid.collides(rect) == (rect.collidelist(walls) != -1)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_grid_matches_sprite_groups(seed):
+    fast = PacmanGameAI(headless=True, seed=seed)
+    reference = PacmanGameAI(headless=True, seed=seed)
+    # Route every collision of the reference game through spritecollide
+    reference.wall_grid = reference.wall_list
+    reference.gate_grid = reference.gate
+
+    actions = random.Random(seed)
+    for _ in range(300):
+        action = actions.randrange(4)
+        result = fast.play_step(action)
+        assert result == reference.play_step(action)
+        assert positions(fast) == positions(reference)
+        if result[1]:
+            break
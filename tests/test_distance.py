@@ -0,0 +1,91 @@
+import numpy as np
+
+from pacman import distance
+from pacman.batch_env import DELTAS
+from pacman.distance import UNREACHABLE, ghost_distances, pacman_distances, load_distance_field
+from pacman.maze import load_maze
+from pacman.pacman import PacmanGameAI
+from pacman.state import StateEncoder
+
+
+PACMAN, BLINKY, PINKY = (load_maze().spawn(actor) for actor in ('pacman', 'blinky', 'pinky'))
+
+
+def positions(field):
+    # Pixel positions on Pacman's lattice, one per walkable tile
+    return np.stack([(field.cells[:, 1] - 1) * 30 + PACMAN[0] % 30,
+                     (field.cells[:, 0] - 1) * 30 + PACMAN[1] % 30], axis=1)
+
+
+def test_distances_are_shortest_paths():
+    field = ghost_distances()
+    n = len(field)
+    d = field.distances[:n, :n].astype(np.int64)
+    assert (np.diag(d) == 0).all()
+    np.testing.assert_array_equal(d, d.T)
+    # Every tile is one step from its neighbours, so their distances differ by at most one
+    for k in range(4):
+        neighbour = field.neighbours[:n, k]
+        has = neighbour < n
+        assert (np.abs(d[has] - d[neighbour[has]]) == 1).all()
+        assert (d[neighbour[has], np.flatnonzero(has)] == 1).all()
+
+
+def test_next_move_walks_a_shortest_path():
+    field = ghost_distances()
+    tiles = positions(field)
+    rng = np.random.default_rng(0)
+    for a, b in rng.integers(len(field), size=(200, 2)):
+        position, target = tiles[a], tiles[b]
+        steps = 0
+        while field.next_move(position, target) != -1:
+            position = position + DELTAS[field.next_move(position, target)]
+            steps += 1
+        assert tuple(position) == tuple(target)
+        assert steps == field.distance(tiles[a], target)
+
+
+def test_gate_separates_pacman_from_spawn_box():
+    assert pacman_distances().distance(PACMAN, PINKY) == UNREACHABLE
+    assert ghost_distances().distance(PINKY, PACMAN) < UNREACHABLE
+    # Batched lookups broadcast like NumPy
+    field = ghost_distances()
+    queries = np.array([PACMAN, BLINKY, PINKY])
+    np.testing.assert_array_equal(field.distance(queries[:, None], queries[None]).diagonal(), 0)
+
+
+def test_disk_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(distance, '_fields', {})
+    first = pacman_distances(cache_dir=str(tmp_path))
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+
+    monkeypatch.setattr(distance, '_fields', {})
+    second = load_distance_field(first.blocked, first.start, cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(first.distances, second.distances)
+    np.testing.assert_array_equal(first.next_moves, second.next_moves)
+
+
+def test_following_ghost_closes_in_along_the_maze():
+    game = PacmanGameAI(headless=True, seed=0, maze_distance=True)
+    field = ghost_distances()
+    game.blinky.follow_chance = 1.
+
+    previous = field.distance(game.blinky.rect.topleft, game.pacman.rect.topleft)
+    start = previous
+    for _ in range(100):
+        _, game_over, _ = game.play_step(-1)
+        if game_over:
+            break
+        current = field.distance(game.blinky.rect.topleft, game.pacman.rect.topleft)
+        assert current == previous - 1
+        previous = current
+    assert start - previous >= 5
+
+
+def test_maze_distance_safety_scores():
+    game = PacmanGameAI(headless=True, seed=0)
+    state = StateEncoder(maze_distance=True).encode(game)
+    valid = state[0:4].astype(bool)
+    assert set(state[4:8][valid]) <= {0., 1.}
+    assert (state[4:8][~valid] == 0).all()
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from gymnasium.utils.env_checker import check_env
+
+from pacman.env import PacmanEnv, make_vector_env
+from pacman.pacman import PacmanGameAI
+
+
+@pytest.mark.parametrize('action', [4, -1, 100])
+def test_out_of_range_action_leaves_pacman_in_place(action):
+    game = PacmanGameAI(headless=True, seed=0)
+    start = game.pacman.rect.topleft
+    game.play_step(action)
+    assert game.pacman.rect.topleft == start
+
+
+def test_int_and_one_hot_actions_agree():
+    by_index = PacmanGameAI(headless=True, seed=3)
+    by_one_hot = PacmanGameAI(headless=True, seed=3)
+    actions = np.random.default_rng(3)
+    for _ in range(200):
+        action = int(actions.integers(4))
+        one_hot = [0, 0, 0, 0]
+        one_hot[action] = 1
+        assert by_index.play_step(action) == by_one_hot.play_step(one_hot)
+        assert by_index.get_snapshot() == by_one_hot.get_snapshot()
+
+
+def test_env_passes_checker():
+    check_env(PacmanEnv(), skip_render_check=True)
+
+
+def test_seeded_resets_repeat():
+    env = PacmanEnv()
+    runs = []
+    for _ in range(2):
+        obs, _ = env.reset(seed=7)
+        trajectory = [obs]
+        for step in range(100):
+            obs, reward, terminated, truncated, info = env.step(step % 4)
+            trajectory.append(obs)
+            if terminated:
+                break
+        runs.append(np.array(trajectory))
+    np.testing.assert_array_equal(runs[0], runs[1])
+
+
+def test_sync_vector_env_shapes():
+    envs = make_vector_env(3)
+    obs, _ = envs.reset(seed=0)
+    assert obs.shape == (3, 33)
+    obs, rewards, terminated, truncated, _ = envs.step(np.zeros(3, dtype=np.int64))
+    assert obs.shape == (3, 33) and rewards.shape == (3,)
+    envs.close()
+
+
+def test_action_repeat_sums_rewards_of_single_steps():
+    single = PacmanEnv()
+    repeated = PacmanEnv(action_repeat=4)
+    single.reset(seed=5)
+    repeated.reset(seed=5)
+    for step in range(50):
+        action = step // 3 % 4
+        total = 0.
+        for _ in range(4):
+            obs, reward, terminated, _, _ = single.step(action)
+            total += reward
+            if terminated:
+                break
+        repeated_obs, repeated_reward, repeated_terminated, _, _ = repeated.step(action)
+        np.testing.assert_array_equal(obs, repeated_obs)
+        assert repeated_reward == total and repeated_terminated == terminated
+        if terminated:
+            break
+
+
+def test_action_repeat_stops_on_death():
+    env = PacmanEnv(action_repeat=1000)
+    env.reset(seed=0)
+    _, reward, terminated, _, info = env.step(0)
+    assert terminated
+    assert 1 <= info['steps'] < 1000
+    assert env.game.frame_iteration == info['steps']
+    assert reward <= 10 * info['steps'] - 10
+
+
+def test_action_repeat_discounted_return():
+    gamma = 0.9
+    single = PacmanGameAI(headless=True, seed=2)
+    env = PacmanEnv(action_repeat=6, gamma=gamma)
+    env.reset(seed=2)
+    rewards = []
+    for _ in range(6):
+        reward, game_over, _ = single.play_step(1)
+        rewards.append(reward)
+        if game_over:
+            break
+    _, reward, _, _, info = env.step(1)
+    assert info['steps'] == len(rewards)
+    assert info['discount'] == pytest.approx(gamma ** len(rewards))
+    assert reward == pytest.approx(sum(gamma ** i * r for i, r in enumerate(rewards)))
+
+
+def test_action_repeat_must_be_positive():
+    with pytest.raises(ValueError):
+        PacmanEnv(action_repeat=0)
+
+
+def test_grid_observations_pass_checker():
+    env = PacmanEnv(observation='grid', frame_stack=2)
+    check_env(env, skip_render_check=True)
+    obs, _ = env.reset(seed=0)
+    assert obs.shape == (16, 19, 19)
+    np.testing.assert_array_equal(obs[:8], obs[8:])
+
+
+def test_sync_vector_env_grid_shapes():
+    envs = make_vector_env(2, observation='grid', frame_stack=2)
+    obs, _ = envs.reset(seed=0)
+    assert obs.shape == (2, 16, 19, 19)
+    envs.close()
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import torch
+
+from agent import make_model
+from evaluate import GHOST_NAMES, evaluate, summarize
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    torch.manual_seed(0)
+    path = str(tmp_path / 'model.pth')
+    torch.save(make_model().state_dict(), path)
+    return path
+
+
+def test_episodes_are_repeatable_across_pools(checkpoint):
+    inline = evaluate(checkpoint, n_episodes=6, workers=0, seed=3, max_steps=300)
+    pooled = evaluate(checkpoint, n_episodes=6, workers=2, seed=3, max_steps=300)
+    assert inline['per_episode'] == pooled['per_episode']
+    assert [e['seed'] for e in inline['per_episode']] == list(range(3, 9))
+
+
+def test_summary_is_consistent(checkpoint):
+    summary = evaluate(checkpoint, n_episodes=8, workers=0, max_steps=200)
+    episodes = summary['per_episode']
+    assert summary['episodes'] == 8 and sum(summary['outcomes'].values()) == 8
+    for episode in episodes:
+        # A pellet is worth one point
+        assert episode['score'] == episode['pellets_eaten']
+        assert 1 <= episode['length'] <= 200
+        assert (episode['outcome'] == 'timeout') == (episode['length'] == 200)
+        assert episode['outcome'] in GHOST_NAMES + ('cleared', 'timeout')
+    score = summary['score']
+    assert score['min'] <= score['p5'] <= score['median'] <= score['p95'] <= score['max']
+    json.dumps(summary)
+
+
+@pytest.mark.parametrize('n_episodes', [0, -1])
+def test_no_episodes_is_an_error(checkpoint, n_episodes):
+    with pytest.raises(ValueError):
+        evaluate(checkpoint, n_episodes=n_episodes, workers=0)
+
+
+def test_command_rejects_no_episodes(checkpoint, tmp_path):
+    result = subprocess.run([sys.executable, os.path.join(REPO, 'evaluate.py'), checkpoint,
+                             '--episodes', '0'],
+                            capture_output=True, text=True, cwd=tmp_path, timeout=120)
+    assert result.returncode == 2 and '--episodes' in result.stderr
+
+
+def test_summarize_counts_outcomes():
+    episodes = [{'score': s, 'length': 10 * s, 'pellets_eaten': s, 'outcome': o}
+                for s, o in [(1, 'blinky'), (2, 'blinky'), (3, 'timeout')]]
+    summary = summarize(episodes)
+    assert summary['score']['mean'] == 2. and summary['length']['median'] == 20.
+    assert summary['outcomes']['blinky'] == 2 and summary['outcomes']['timeout'] == 1
+    assert summary['outcomes']['clyde'] == 0
+
+
+def test_command_writes_the_summary(checkpoint, tmp_path):
+    output = tmp_path / 'summary.json'
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy')
+    result = subprocess.run([sys.executable, os.path.join(REPO, 'evaluate.py'), checkpoint,
+                             '--episodes', '4', '--workers', '1', '--max-steps', '100',
+                             '--output', str(output)],
+                            check=True, capture_output=True, text=True, env=env, cwd=tmp_path,
+                            timeout=120)
+    summary = json.loads(output.read_text())
+    assert json.loads(result.stdout) == summary
+    assert summary['episodes'] == 4 and 'per_episode' not in summary
@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+import torch
+
+from agent import Agent, STATE_SIZE, make_model
+from inference import InferenceServer, epsilon_greedy
+
+
+def test_epsilon_greedy_limits():
+    rng = np.random.default_rng(0)
+    q_values = rng.random((1000, 4))
+    greedy = q_values.argmax(axis=1)
+    np.testing.assert_array_equal(epsilon_greedy(q_values, 0., rng), greedy)
+
+    actions = epsilon_greedy(q_values, 1., rng)
+    assert set(actions) == {0, 1, 2, 3}
+    assert (actions != greedy).mean() > 0.6
+
+    # Per-row epsilon
+    epsilon = np.r_[np.zeros(500), np.ones(500)]
+    actions = epsilon_greedy(q_values, epsilon, rng)
+    np.testing.assert_array_equal(actions[:500], greedy[:500])
+
+
+def test_served_actions_match_batched_forward_pass():
+    torch.manual_seed(0)
+    model = make_model()
+    states = np.random.default_rng(0).random((300, STATE_SIZE), dtype=np.float32)
+    with torch.inference_mode():
+        expected = model(torch.from_numpy(states)).argmax(dim=1).numpy()
+
+    with InferenceServer(model, STATE_SIZE, max_batch_size=64, max_latency=0.05) as server:
+        np.testing.assert_array_equal(server.act(states), expected)
+        futures = [server.submit(state) for state in states]
+        actions = [future.result(timeout=10) for future in futures]
+    np.testing.assert_array_equal(actions, expected)
+    assert server.n_requests == 300
+    assert server.n_batches >= 300 // 64
+    assert server.batch_sizes[:server.n_batches].max() <= 64
+    latency = server.latency_percentiles()
+    assert 0 <= latency[50] <= latency[99]
+
+
+def test_concurrent_submitters():
+    model = make_model()
+    results = {}
+
+    def game(i, server):
+        rng = np.random.default_rng(i)
+        results[i] = [server.submit(rng.random(STATE_SIZE)).result(timeout=10)
+                      for _ in range(20)]
+
+    with InferenceServer(model, STATE_SIZE, max_batch_size=8) as server:
+        threads = [threading.Thread(target=game, args=(i, server)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(results) == 8
+    assert all(len(actions) == 20 and set(actions) <= {0, 1, 2, 3}
+               for actions in results.values())
+
+
+def test_agent_get_actions():
+    agent = Agent()
+    agent.n_games = 1000
+    states = np.random.default_rng(0).random((16, STATE_SIZE))
+    with torch.inference_mode():
+        expected = agent.model(torch.as_tensor(states, dtype=torch.float32)).argmax(dim=1)
+    np.testing.assert_array_equal(agent.get_actions(states), expected.numpy())
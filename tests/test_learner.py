@@ -0,0 +1,66 @@
+import time
+
+import pytest
+import torch
+
+from agent import Agent
+from learner import ActorLearner
+from pacman.pacman import PacmanGameAI
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # Best scores save the model under ./model
+    monkeypatch.chdir(tmp_path)
+
+
+def make(**kwargs):
+    return ActorLearner(Agent(), PacmanGameAI(headless=True, seed=0), seed=0, **kwargs)
+
+
+def test_replay_ratio_and_publishing():
+    runner = make(replay_ratio=0.5, publish_interval=10, chunk_size=16, batch_size=32)
+    runner.run(max_steps=500)
+    assert runner.steps == runner.inserted == len(runner.agent.memory) == 500
+    # Every update owed for the steps sent is done before the learner stops
+    assert runner.updates == runner.agent.trainer.updates == int(0.5 * (500 - 32))
+    assert runner.published == runner.updates // 10
+
+
+def test_actor_plays_with_published_weights():
+    runner = make(replay_ratio=1., publish_interval=1, chunk_size=8, batch_size=16)
+    runner.run(max_steps=200)
+    runner._load_published()
+    for actor, learner in zip(runner.actor_model.parameters(),
+                              runner.agent.model.parameters()):
+        assert torch.equal(actor, learner)
+        assert not actor.requires_grad
+
+
+def test_slow_learner_holds_the_actor_back():
+    runner = make(replay_ratio=1., chunk_size=4, max_pending=2, batch_size=4, warmup=0)
+    train_step = runner.agent.trainer.train_step
+    ahead = []
+
+    def slow_train_step(*args):
+        time.sleep(0.002)
+        ahead.append(runner.steps - runner.updates)
+        return train_step(*args)
+
+    runner.agent.trainer.train_step = slow_train_step
+    runner.run(max_steps=200)
+    assert runner.updates == 200
+    # Queued chunks, the chunk in the learner's hands and the one being filled
+    assert max(ahead) <= 4 * (2 + 2)
+
+
+def test_learner_errors_reach_the_actor():
+    runner = make(chunk_size=4, batch_size=4, warmup=0)
+
+    def broken(*args):
+        raise ValueError('boom')
+
+    runner.agent.trainer.train_step = broken
+    with pytest.raises(RuntimeError) as info:
+        runner.run(max_steps=1000)
+    assert isinstance(info.value.__cause__, ValueError)
@@ -0,0 +1,139 @@
+import json
+
+import numpy as np
+import pygame
+import pytest
+
+from pacman import maze as maze_module
+from pacman.batch_env import BatchedPacmanEnv
+from pacman.env import PacmanEnv
+from pacman.collision import CollisionGrid
+from pacman.maze import compile_maze, load_maze, parse_text
+from pacman.pacman import PacmanGameAI
+
+# Room one as the game hard coded it before mazes/room_one.json
+ROOM_ONE_WALLS = [
+    [0, 0, 6, 600], [0, 0, 600, 6], [0, 600, 606, 6], [600, 0, 6, 606], [300, 0, 6, 66],
+    [60, 60, 186, 6], [360, 60, 186, 6], [60, 120, 66, 6], [60, 120, 6, 126],
+    [180, 120, 246, 6], [300, 120, 6, 66], [480, 120, 66, 6], [540, 120, 6, 126],
+    [120, 180, 126, 6], [120, 180, 6, 126], [360, 180, 126, 6], [480, 180, 6, 126],
+    [180, 240, 6, 126], [180, 360, 246, 6], [420, 240, 6, 126], [240, 240, 42, 6],
+    [324, 240, 42, 6], [240, 240, 6, 66], [240, 300, 126, 6], [360, 240, 6, 66],
+    [0, 300, 66, 6], [540, 300, 66, 6], [60, 360, 66, 6], [60, 360, 6, 186],
+    [480, 360, 66, 6], [540, 360, 6, 186], [120, 420, 366, 6], [120, 420, 6, 66],
+    [480, 420, 6, 66], [180, 480, 246, 6], [300, 480, 6, 66], [120, 540, 126, 6],
+    [360, 540, 126, 6],
+]
+GATE_RECT = [282, 242, 42, 2]
+# Pacman, Blinky, Pinky, Inky and Clyde
+SPAWNS = [[287, 439], [287, 199], [287, 259], [255, 259], [319, 259]]
+wall_grid = CollisionGrid(ROOM_ONE_WALLS)
+gate_grid = CollisionGrid([GATE_RECT])
+
+SMALL = """
+#########
+#...B...#
+#.##-##.#
+#.#KIC#.#
+#.#####.#
+#...P...#
+#########
+"""
+
+
+def test_room_one_matches_the_hard_coded_maze():
+    maze = load_maze()
+    assert maze.walls == ROOM_ONE_WALLS
+    assert maze.gate == GATE_RECT
+    assert maze.size == (606, 606)
+    np.testing.assert_array_equal(maze.spawns, SPAWNS)
+    for (x, y), table in zip(maze.spawns, maze.blocked):
+        np.testing.assert_array_equal(table, wall_grid.array(x, y, 32, 32))
+    np.testing.assert_array_equal(maze.gate_blocked, gate_grid.array(*SPAWNS[0], 32, 32))
+    assert maze.pellets.shape == (19, 19) and maze.pellets.sum() == 209
+    assert not maze.pellets.flags.writeable
+
+
+def test_legal_moves_match_the_collision_grid():
+    maze = load_maze()
+    rows, cols = maze.blocked.shape[1:]
+    for row in range(1, rows - 1):
+        for col in range(1, cols - 1):
+            x, y = (col - 1) * 30 + SPAWNS[0][0] % 30, (row - 1) * 30 + SPAWNS[0][1] % 30
+            # RIGHT, LEFT, DOWN, UP
+            expected = [not wall_grid.collides(rect) and not gate_grid.collides(rect)
+                        for rect in (pygame.Rect(x + dx, y + dy, 32, 32)
+                                     for dx, dy in ((30, 0), (-30, 0), (0, 30), (0, -30)))]
+            assert list(maze.moves[0, row, col]) == expected
+
+
+def test_cache_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / 'small.txt'
+    path.write_text(SMALL)
+    monkeypatch.setattr(maze_module, '_mazes', {})
+    compiled = load_maze(str(path), cache_dir=str(tmp_path / 'cache'))
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+    monkeypatch.setattr(maze_module, '_mazes', {})
+    monkeypatch.setattr(maze_module, 'compile_maze', None)  # must not recompile
+    cached = load_maze(str(path), cache_dir=str(tmp_path / 'cache'))
+    assert cached.spec == compiled.spec
+    for name in ('spawns', 'blocked', 'gate_blocked', 'moves', 'pellets'):
+        np.testing.assert_array_equal(getattr(cached, name), getattr(compiled, name))
+
+    # Editing the maze changes its key
+    path.write_text(SMALL.replace('#...P...#', '#..P....#'))
+    monkeypatch.setattr(maze_module, 'compile_maze', compile_maze)
+    assert load_maze(str(path), cache_dir=str(tmp_path / 'cache')).key != compiled.key
+
+
+def test_text_maze_plays(tmp_path):
+    path = tmp_path / 'small.txt'
+    path.write_text(SMALL)
+    maze = load_maze(str(path), cache_dir=None)
+    assert maze.size == (9 * 30 + 6, 7 * 30 + 6)
+    assert maze.pellets.sum() == SMALL.count('.')
+
+    game = PacmanGameAI(headless=True, seed=0, maze=maze)
+    assert game.pacman.rect.topleft == (4 * 30 + 17, 5 * 30 + 19)
+    # Pacman can't go through the walls or the gate, ghosts get out
+    actions = np.random.default_rng(0)
+    left_spawn = False
+    for _ in range(500):
+        _, game_over, _ = game.play_step(int(actions.integers(4)))
+        assert not maze.blocked[0][game.pacman.rect.top // 30 + 1, game.pacman.rect.left // 30 + 1]
+        assert game.pacman.rect.top // 30 != 2 or game.pacman.rect.left // 30 != 4
+        left_spawn |= any(ghost.has_left_spawn for ghost in game.ghosts)
+        if game_over:
+            game.reset()
+    assert left_spawn
+
+
+def test_batch_env_and_gym_env_take_a_maze(tmp_path):
+    path = tmp_path / 'small.txt'
+    path.write_text(SMALL)
+    maze = load_maze(str(path), cache_dir=None)
+    env = BatchedPacmanEnv(8, seed=0, maze=maze, maze_distance=True)
+    assert env.pellets.shape == (8,) + maze.pellets.shape
+    for _ in range(100):
+        env.step(np.random.default_rng(0).integers(4, size=8))
+
+    gym_env = PacmanEnv(maze=maze)
+    obs, _ = gym_env.reset(seed=0)
+    assert obs.shape == (33,)
+
+
+def test_bad_text_mazes():
+    with pytest.raises(ValueError, match='spawn'):
+        parse_text(SMALL.replace('P', '.'), 'bad')
+    with pytest.raises(ValueError, match='gate'):
+        parse_text(SMALL.replace('-', '#'), 'bad')
+    with pytest.raises(ValueError, match='character'):
+        parse_text(SMALL.replace('P', 'X'), 'bad')
+
+
+def test_shipped_mazes_load():
+    for name in ('room_one', 'small'):
+        maze = load_maze(name, cache_dir=None)
+        assert maze.pellets.any()
+        json.dumps(maze.spec)
@@ -0,0 +1,14 @@
+import torch
+
+from agent import Agent
+
+
+def test_building_an_agent_keeps_the_thread_count():
+    # Rollout workers pin themselves to one thread before building an Agent
+    threads = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        Agent()
+        assert torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(threads)
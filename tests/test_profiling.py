@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+
+from agent import Agent
+from pacman.pacman import PacmanGameAI
+from pacman.profiling import GAME_PHASES, Profiler, profile_agent, profile_game, prometheus_text
+
+
+def play(game, steps=200):
+    actions = np.random.default_rng(0)
+    results = []
+    for _ in range(steps):
+        result = game.play_step(int(actions.integers(4)))
+        results.append(result)
+        if result[1]:
+            game.reset()
+    return results
+
+
+def test_profiled_game_plays_the_same():
+    plain = play(PacmanGameAI(headless=True, seed=0))
+    profiler = Profiler()
+    game = profile_game(profiler, PacmanGameAI(headless=True, seed=0))
+    assert play(game) == plain
+
+    snapshot = profiler.snapshot()
+    assert snapshot['counters']['steps'] == 200
+    assert snapshot['phases']['game.play_step']['calls'] == 200
+    assert snapshot['phases']['ghost.choose_move']['calls'] == 4 * 200
+    assert snapshot['phases']['game.move_ghosts']['calls'] == 200
+    # Headless games never draw
+    assert 'game.update_ui' not in snapshot['phases']
+    assert snapshot['episodes']['count'] == snapshot['counters'].get('resets', 0)
+
+
+def test_detach_restores_the_game():
+    profiler = Profiler()
+    game = profile_game(profiler, PacmanGameAI(headless=True))
+    profiler.detach()
+    for name in GAME_PHASES + ('play_step', 'reset'):
+        assert name not in vars(game)
+    for ghost in game.ghosts:
+        assert 'move' not in vars(ghost) and 'choose_move' not in vars(ghost)
+    play(game, 10)
+    assert not profiler.calls
+
+
+def test_rendered_phases_are_timed():
+    profiler = Profiler()
+    game = profile_game(profiler, PacmanGameAI(render_every=5))
+    play(game, 10)
+    assert profiler.calls['game.update_ui'] == profiler.calls['game.tick'] == 2
+    assert profiler.calls['game.handle_events'] == 10
+
+
+def test_agent_phases():
+    profiler = Profiler()
+    agent = profile_agent(profiler, Agent())
+    game = PacmanGameAI(headless=True)
+    state = agent.get_state(game)
+    agent.get_action(state)
+    agent.remember(state, 0, 0, state, False)
+    agent.train_long_memory()
+    assert {'agent.get_state', 'agent.get_action', 'trainer.train_step',
+            'replay.sample'} <= set(profiler.calls)
+
+
+def test_exports(tmp_path):
+    profiler = Profiler(str(tmp_path / 'timings.jsonl'), interval=0.)
+    game = profile_game(profiler, PacmanGameAI(headless=True))
+    play(game, 50)
+    profiler.maybe_export()
+    play(game, 50)
+    profiler.maybe_export()
+    lines = (tmp_path / 'timings.jsonl').read_text().splitlines()
+    assert len(lines) == 2
+    last = json.loads(lines[-1])
+    assert last['counters']['steps'] == 100
+    assert last['rates']['steps_per_second'] > 0
+
+    profiler.export(str(tmp_path / 'timings.prom'))
+    text = (tmp_path / 'timings.prom').read_text()
+    assert 'pacman_phase_seconds_total{phase="game.play_step"}' in text
+    assert 'pacman_events_total{event="steps"} 100' in text
+
+
+def test_prometheus_episode_length_summary():
+    profiler = Profiler(max_episodes=2)
+    for length in (10, 20, 30):
+        profiler.add_episode(length)
+    text = prometheus_text(profiler.snapshot())
+    # The sum and count cover every episode, the quantiles the recent ones
+    assert 'pacman_episode_length_sum 60\n' in text
+    assert 'pacman_episode_length_count 3\n' in text
+    assert 'pacman_episode_length{quantile="0.5"} 25' in text
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+
+from pacman.pacman import PacmanGameAI
+from pacman.recording import (EpisodeReader, EpisodeWriter, STEP_DTYPE, pixel_positions,
+                              replay)
+
+
+def play(path, seeds, max_steps=300):
+    # Record seeded random games, returning what each step looked like
+    expected = []
+    game = PacmanGameAI(headless=True)
+    with EpisodeWriter(path, max_steps=16) as writer:
+        for seed in seeds:
+            game.reset(seed=seed)
+            writer.begin_episode(seed)
+            actions = np.random.default_rng(seed)
+            frames = []
+            for _ in range(max_steps):
+                action = int(actions.integers(4))
+                reward, game_over, score = game.play_step(action)
+                writer.record(game, action, reward, game_over)
+                frames.append(([a.rect.topleft for a in (game.pacman,) + game.ghosts],
+                               game.pellets.copy(), score, action, reward, game_over))
+                if game_over:
+                    break
+            writer.end_episode(game.score)
+            expected.append(frames)
+    return expected
+
+
+def test_step_records_are_small():
+    assert STEP_DTYPE.itemsize == 14
+
+
+def test_round_trip_and_replay(tmp_path):
+    path = str(tmp_path / 'episodes.rec')
+    expected = play(path, seeds=[0, 1, 2])
+
+    with EpisodeReader(path) as reader:
+        assert len(reader) == 3
+        assert list(reader.index['seed']) == [0, 1, 2]
+        for episode, frames in zip(reader, expected):
+            assert len(episode.steps) == len(frames)
+            assert episode.score == frames[-1][2]
+            positions = pixel_positions(episode.steps)
+            np.testing.assert_array_equal(positions, [f[0] for f in frames])
+            np.testing.assert_array_equal(episode.steps['action'], [f[3] for f in frames])
+            np.testing.assert_array_equal(episode.steps['reward'], [f[4] for f in frames])
+            np.testing.assert_array_equal(episode.steps['done'], [f[5] for f in frames])
+
+            game = PacmanGameAI(headless=True)
+            for step, frame in zip(replay(episode, game), frames):
+                assert [a.rect.topleft for a in (game.pacman,) + game.ghosts] == frame[0]
+                np.testing.assert_array_equal(game.pellets, frame[1])
+                assert game.score == frame[2]
+
+
+def test_appends_to_an_existing_recording(tmp_path):
+    path = str(tmp_path / 'episodes.rec')
+    play(path, seeds=[0])
+    play(path, seeds=[1, 2])
+    with EpisodeReader(path) as reader:
+        assert list(reader.index['seed']) == [0, 1, 2]
+
+
+def test_recovers_from_a_torn_write(tmp_path):
+    path = str(tmp_path / 'episodes.rec')
+    play(path, seeds=[0, 1])
+    size = os.path.getsize(path)
+    # A crash in the middle of writing a third episode, before its index entry
+    with open(path, 'ab') as f:
+        f.write(b'EPIS' + b'\xff' * 30)
+
+    with EpisodeReader(path) as reader:
+        assert len(reader) == 2
+    expected = play(path, seeds=[2])
+    with EpisodeReader(path) as reader:
+        assert list(reader.index['seed']) == [0, 1, 2]
+        assert reader.index['offset'][2] == size
+        assert len(reader[2].steps) == len(expected[0])
+
+
+def test_rebuilds_a_missing_index(tmp_path):
+    path = str(tmp_path / 'episodes.rec')
+    play(path, seeds=[0, 1])
+    with EpisodeReader(path) as reader:
+        index = reader.index.copy()
+    os.remove(path + '.idx')
+    with EpisodeReader(path) as reader:
+        np.testing.assert_array_equal(reader.index, index)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-recording'
+    path.write_bytes(b'hello world')
+    with pytest.raises(ValueError):
+        EpisodeReader(str(path))
+
+
+def test_rendered_replay(tmp_path):
+    path = str(tmp_path / 'episodes.rec')
+    play(path, seeds=[0], max_steps=20)
+    with EpisodeReader(path) as reader:
+        steps = list(replay(reader[0], render=True))
+    assert len(steps) == reader.index["n_steps"][0]
@@ -0,0 +1,55 @@
+import numpy as np
+import pygame
+import pytest
+
+from pacman.pacman import PacmanGameAI, Renderer
+
+
+def full_frame(game):
+    # What a renderer redrawing everything from scratch shows
+    reference = Renderer(pygame.Surface(game.screen.get_size()), game.maze)
+    reference.draw(game)
+    return pygame.image.tobytes(reference.screen, 'RGB')
+
+
+@pytest.fixture
+def game():
+    game = PacmanGameAI(seed=4)
+    game._tick = lambda: None
+    return game
+
+
+def test_dirty_frames_match_full_redraws(game):
+    actions = np.random.default_rng(4)
+    for step in range(300):
+        _, game_over, _ = game.play_step(int(actions.integers(4)))
+        if game_over:
+            game.reset()
+            game._update_ui()
+        assert pygame.image.tobytes(game.screen, 'RGB') == full_frame(game), step
+
+
+def test_restore_and_rerender_match_full_redraws(game):
+    snapshot = game.get_snapshot()
+    for _ in range(20):
+        game.play_step(1)
+    game.restore(snapshot)
+    game._update_ui()
+    assert pygame.image.tobytes(game.screen, 'RGB') == full_frame(game)
+
+    game.set_render(False)
+    for _ in range(20):
+        game.play_step(0)
+    game.set_render(True)
+    game._update_ui()
+    assert pygame.image.tobytes(game.screen, 'RGB') == full_frame(game)
+
+
+def test_frames_only_update_around_the_actors(game):
+    game.play_step(0)
+    width, height = game.screen.get_size()
+    for _ in range(20):
+        game.play_step(0)
+        dirty = game.renderer.draw(game)
+        area = sum(rect.width * rect.height for rect in dirty)
+        assert 0 < area < width * height // 20
@@ -0,0 +1,55 @@
+import numpy as np
+
+from replay import ReplayBuffer, PrioritizedReplayBuffer, SumTree
+
+
+def transitions(n, state_size=33):
+    states = np.arange(n * state_size, dtype=np.float32).reshape(n, state_size)
+    return states, np.arange(n) % 4, np.ones(n), states + 1, np.zeros(n, dtype=bool)
+
+
+def test_ring_buffer_wraps():
+    buffer = ReplayBuffer(100, 33)
+    buffer.push_batch(*transitions(150))
+    assert len(buffer) == 100
+    assert buffer.position == 50
+    states, actions, rewards, next_states, dones = buffer.sample(32)
+    assert states.shape == (32, 33)
+    assert (next_states == states + 1).all()
+
+
+def test_sum_tree_find_and_update():
+    tree = SumTree(10)
+    priorities = np.random.default_rng(0).random(10)
+    tree.update(np.arange(10), priorities)
+    assert np.isclose(tree.total, priorities.sum())
+
+    prefix_sums = np.random.default_rng(1).random(1000) * priorities.sum()
+    expected = np.searchsorted(np.cumsum(priorities), prefix_sums, side='right')
+    assert (tree.find(prefix_sums) == expected).all()
+
+    tree.update([3, 3, 5], [0., 0., 0.])
+    assert np.isclose(tree.total, priorities.sum() - priorities[3] - priorities[5])
+
+
+def test_empty_batch_is_a_no_op():
+    buffer = PrioritizedReplayBuffer(100, 33)
+    buffer.push_batch(*transitions(0))
+    assert len(buffer) == 0
+    assert buffer.tree.total == 0
+
+
+def test_prioritized_sampling():
+    buffer = PrioritizedReplayBuffer(100, 33, eps=1e-12)
+    buffer.rng = np.random.default_rng(0)
+    buffer.push_batch(*transitions(50))
+    batch, indices, weights = buffer.sample(16)
+    assert batch[0].shape == (16, 33)
+    assert weights.shape == (16,)
+    assert (indices < 50).all()
+
+    # Only transition 7 keeps any priority, so it is all that gets sampled
+    buffer.update_priorities(np.arange(50), np.zeros(50))
+    buffer.update_priorities([7], [100.])
+    _, indices, _ = buffer.sample(16)
+    assert (indices == 7).all()
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_elsewhere(code, tmp_path):
+    # A fresh interpreter outside the repository, so nothing is initialised yet
+    env = dict(os.environ, PYTHONPATH=REPO, SDL_VIDEODRIVER='dummy')
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.split()
+
+
+def test_import_and_headless_games_leave_sdl_alone(tmp_path):
+    out = run_elsewhere(
+        'import pygame, pacman.pacman as p\n'
+        'print(pygame.get_init(), pygame.display.get_init(), pygame.font.get_init())\n'
+        'game = p.PacmanGameAI(headless=True)\n'
+        'game.play_step(0)\n'
+        'print(pygame.display.get_init(), pygame.font.get_init())\n', tmp_path)
+    assert out == ['False', 'False', 'False', 'False', 'False']
+
+
+def test_rendered_game_finds_its_assets_from_any_directory(tmp_path):
+    out = run_elsewhere(
+        'import os, pygame, pacman.pacman as p\n'
+        'game = p.PacmanGameAI(render_every=1)\n'
+        'game.play_step(0)\n'
+        'print(pygame.display.get_init(), pygame.font.get_init(),'
+        ' os.environ["SDL_NO_SIGNAL_HANDLERS"])\n', tmp_path)
+    assert out == ['True', 'True', '1']
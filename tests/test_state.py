@@ -0,0 +1,123 @@
+from math import sqrt
+
+import numpy as np
+import pytest
+
+from pacman.batch_env import BatchedPacmanEnv
+from pacman.pacman import PacmanGameAI
+from pacman.state import GridEncoder, StateEncoder, GRID_CHANNELS, STATE_SIZE
+
+
+def reference_state(game):
+    # The list-based Agent.get_state the encoder replaced
+    px, py = game.pacman.rect.topleft
+    ghosts = [ghost.rect.topleft for ghost in (game.blinky, game.pinky, game.inky, game.clyde)]
+
+    valid_directions = game.pacman.get_valid_directions(game.wall_grid, game.gate_grid)
+    mask = game.pacman.get_valid_directions_mask(valid_directions)
+
+    distances = [sqrt((px - gx) ** 2 + (py - gy) ** 2) for gx, gy in ghosts]
+    safety = [0., 0., 0., 0.]
+    for index, (dx, dy) in enumerate([(30, 0), (-30, 0), (0, -30), (0, 30)]):
+        if mask[index] == 0:
+            continue
+        nx, ny = px + dx, py + dy
+        changes = [sqrt((nx - gx) ** 2 + (ny - gy) ** 2) - d
+                   for (gx, gy), d in zip(ghosts, distances)]
+        safety[index] = (min(changes) + 30) / 60
+
+    food = [[0] * 5 for _ in range(5)]
+    for row, col in zip(*np.nonzero(game.pellets)):
+        # Pellet sprites sit at (30 * col + 32, 30 * row + 32)
+        grid_x = (30 * col + 32 - px) // 30 + 2
+        grid_y = (30 * row + 32 - py) // 30 + 2
+        if 0 <= grid_x < 5 and 0 <= grid_y < 5:
+            food[grid_y][grid_x] = 1
+
+    return mask + safety + [cell for row in food for cell in row]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_encode_matches_reference(seed):
+    game = PacmanGameAI(headless=True, seed=seed)
+    encoder = StateEncoder()
+    actions = np.random.default_rng(seed)
+    for _ in range(300):
+        state = encoder.encode(game)
+        assert state.shape == (STATE_SIZE,)
+        np.testing.assert_array_equal(state, reference_state(game))
+        _, game_over, _ = game.play_step(int(actions.integers(4)))
+        if game_over:
+            game.reset()
+
+
+def test_encode_batch_matches_encode():
+    env = BatchedPacmanEnv(64, seed=0)
+    batch_encoder = StateEncoder(64)
+    single_encoder = StateEncoder()
+    actions = np.random.default_rng(1)
+    for _ in range(100):
+        states = batch_encoder.encode_batch(env.pacman, env.ghosts, env.pellets)
+        for i in range(env.n_games):
+            expected = single_encoder.encode_batch(env.pacman[i:i + 1], env.ghosts[i:i + 1],
+                                                   env.pellets[i:i + 1])[0]
+            np.testing.assert_array_equal(states[i], expected)
+        env.step(actions.integers(4, size=env.n_games))
+
+
+def reference_grid(game):
+    # The board drawn tile by tile from the sprites
+    grid = np.zeros((len(GRID_CHANNELS), 19, 19))
+    for row in range(19):
+        for col in range(19):
+            x, y = 30 * col + game.pacman.rect.left % 30, 30 * row + game.pacman.rect.top % 30
+            rect = game.pacman.rect.move(x - game.pacman.rect.left, y - game.pacman.rect.top)
+            grid[0, row, col] = game.wall_grid.collides(rect)
+            grid[-1, row, col] = game.gate_grid.collides(rect)
+    grid[1] = game.pellets
+    for channel, actor in enumerate((game.pacman,) + game.ghosts, start=2):
+        grid[channel, actor.rect.top // 30, actor.rect.left // 30] = 1
+    return grid
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_grid_matches_reference(seed):
+    game = PacmanGameAI(headless=True, seed=seed)
+    encoder = GridEncoder()
+    actions = np.random.default_rng(seed)
+    for _ in range(200):
+        grid = encoder.encode(game)
+        assert grid.shape == (len(GRID_CHANNELS), 19, 19) and grid.dtype == np.float32
+        np.testing.assert_array_equal(grid, reference_grid(game))
+        _, game_over, _ = game.play_step(int(actions.integers(4)))
+        if game_over:
+            game.reset()
+
+
+def test_grid_frame_stack_is_a_view_of_the_last_frames():
+    env = BatchedPacmanEnv(8, seed=0)
+    single = GridEncoder(8)
+    stacked = GridEncoder(8, frames=3)
+    actions = np.random.default_rng(2)
+    history = []
+    for step in range(20):
+        frame = single.encode_batch(env.pacman, env.ghosts, env.pellets).copy()
+        stack = stacked.encode_batch(env.pacman, env.ghosts, env.pellets)
+        assert stack.shape == (8, 3 * len(GRID_CHANNELS), 19, 19)
+        assert np.shares_memory(stack, stacked.ring)
+        # Before three frames exist the first one fills the stack
+        history = (history or [frame] * 3)[1:] + [frame]
+        np.testing.assert_array_equal(stack, np.concatenate(history, axis=1))
+        env.step(actions.integers(4, size=env.n_games))
+
+
+def test_grid_reset_restarts_only_masked_stacks():
+    env = BatchedPacmanEnv(2, seed=0)
+    encoder = GridEncoder(2, frames=2)
+    encoder.encode_batch(env.pacman, env.ghosts, env.pellets)
+    env.step(np.array([1, 1]))
+    encoder.reset(np.array([True, False]))
+    stack = encoder.encode_batch(env.pacman, env.ghosts, env.pellets)
+    channels = len(GRID_CHANNELS)
+    np.testing.assert_array_equal(stack[0, :channels], stack[0, channels:])
+    assert not np.array_equal(stack[1, :channels], stack[1, channels:])
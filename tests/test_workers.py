@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import torch
+
+from agent import make_model
+from pacman.state import STATE_SIZE
+from workers import RolloutPool
+
+
+def test_batches_arrive_from_every_worker():
+    with RolloutPool(2, batch_size=16, seed=0) as pool:
+        # One worker may fill the queue before the other is scheduled
+        batches = [pool.get(timeout=60)]
+        deadline = time.monotonic() + 60
+        while len({batch.worker_id for batch in batches}) < 2 and time.monotonic() < deadline:
+            batches.append(pool.get(timeout=60))
+    assert {batch.worker_id for batch in batches} == {0, 1}
+    for batch in batches:
+        assert batch.states.shape == batch.next_states.shape == (16, STATE_SIZE)
+        assert batch.actions.shape == batch.rewards.shape == batch.dones.shape == (16,)
+        assert ((batch.actions >= 0) & (batch.actions < 4)).all()
+        # Every finished game reports its score
+        assert len(batch.scores) == batch.dones.sum()
+
+
+def test_broadcast_weights_and_epsilon():
+    # A network that always prefers moving down
+    model = make_model()
+    with torch.no_grad():
+        for parameter in model.parameters():
+            parameter.zero_()
+        model.linear2.bias[3] = 1.
+    with RolloutPool(2, model_factory=make_model, batch_size=16, epsilon=1.0, seed=0) as pool:
+        pool.broadcast(model.state_dict(), epsilon=0.)
+        deadline = time.monotonic() + 60
+        # Batches already queued were played with the old policy
+        greedy = set()
+        while len(greedy) < 2 and time.monotonic() < deadline:
+            batch = pool.get(timeout=60)
+            if (batch.actions == 3).all():
+                greedy.add(batch.worker_id)
+        assert greedy == {0, 1}
+
+        # epsilon alone switches back to random moves and keeps the weights
+        pool.broadcast(epsilon=1.)
+        while time.monotonic() < deadline:
+            batch = pool.get(timeout=60)
+            if len(np.unique(batch.actions)) == 4:
+                break
+        else:
+            raise AssertionError('workers never went back to random moves')
+    assert not any(process.is_alive() for process in pool.processes)
@@ -0,0 +1,158 @@
+import random
+import multiprocessing as mp
+from collections import namedtuple
+from queue import Empty
+
+import numpy as np
+import torch
+
+from pacman.pacman import PacmanGameAI
+from pacman.state import StateEncoder, STATE_SIZE
+
+# One batch of transitions from one worker. Actions are indices into
+# [right, left, up, down]; scores are the games that finished in the batch.
+TransitionBatch = namedtuple(
+    'TransitionBatch',
+    ['worker_id', 'states', 'actions', 'rewards', 'next_states', 'dones', 'scores'])
+
+
+def _one_hot(action_idx):
+    move = [0, 0, 0, 0]
+    move[action_idx] = 1
+    return move
+
+
+def _rollout_worker(worker_id, seed, model_factory, batch_size, epsilon,
+                    batch_queue, weights_conn, stop_event):
+    # Each worker owns its seeds, so runs are repeatable per worker
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    # Workers are meant to fill one core each
+    torch.set_num_threads(1)
+
+    game = PacmanGameAI(headless=True, seed=seed)
+    # Only the state encoding is needed here, not a whole Agent with its
+    # replay memory and optimizer
+    encoder = StateEncoder(dtype=np.float32)
+    model = model_factory() if model_factory is not None else None
+
+    states = np.empty((batch_size, STATE_SIZE), dtype=np.float32)
+    next_states = np.empty((batch_size, STATE_SIZE), dtype=np.float32)
+    actions = np.empty(batch_size, dtype=np.int64)
+    rewards = np.empty(batch_size, dtype=np.float32)
+    dones = np.empty(batch_size, dtype=bool)
+    scores = []
+    i = 0
+
+    state = encoder.encode(game).copy()
+    while not stop_event.is_set():
+        # Only the newest weights matter, drop any we fell behind on
+        weights = None
+        while weights_conn.poll():
+            weights = weights_conn.recv()
+        if weights is not None:
+            state_dict, new_epsilon = weights
+            if model is not None and state_dict is not None:
+                model.load_state_dict(state_dict)
+            if new_epsilon is not None:
+                epsilon = new_epsilon
+
+        if model is None or random.random() < epsilon:
+            action_idx = random.randint(0, 3)
+        else:
+            with torch.inference_mode():
+                prediction = model(torch.tensor(state, dtype=torch.float32))
+            action_idx = int(torch.argmax(prediction).item())
+
+        reward, game_over, score = game.play_step(_one_hot(action_idx))
+        next_state = encoder.encode(game).copy()
+
+        states[i] = state
+        actions[i] = action_idx
+        rewards[i] = reward
+        next_states[i] = next_state
+        dones[i] = game_over
+        i += 1
+
+        if game_over:
+            scores.append(score)
+            game.reset()
+            next_state = encoder.encode(game).copy()
+        state = next_state
+
+        if i == batch_size:
+            batch_queue.put(TransitionBatch(worker_id, states.copy(), actions.copy(),
+                                            rewards.copy(), next_states.copy(),
+                                            dones.copy(), scores))
+            scores = []
+            i = 0
+
+
+class RolloutPool:
+    """K headless games stepped in separate processes.
+
+    Workers send TransitionBatch tuples through a bounded queue, which keeps
+    them from running ahead of the learner. broadcast() pushes new policy
+    weights (and optionally epsilon) to every worker through its own pipe.
+    model_factory is a picklable callable building the policy network; with
+    none, workers play uniformly random moves.
+    """
+
+    def __init__(self, n_workers, model_factory=None, batch_size=256, epsilon=1.0,
+                 seed=0, max_pending=None, mp_context=None):
+        ctx = mp.get_context(mp_context)
+        self.n_workers = n_workers
+        self.batch_queue = ctx.Queue(max_pending or 4 * n_workers)
+        self.stop_event = ctx.Event()
+        self.weight_conns = []
+        self.processes = []
+        for worker_id in range(n_workers):
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_rollout_worker,
+                args=(worker_id, seed + worker_id, model_factory, batch_size, epsilon,
+                      self.batch_queue, recv_conn, self.stop_event),
+                daemon=True)
+            self.weight_conns.append(send_conn)
+            self.processes.append(process)
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def broadcast(self, state_dict=None, epsilon=None):
+        """Send new weights and/or epsilon to every worker"""
+        if state_dict is not None:
+            # Plain CPU tensors pickle cheaply and load in any worker
+            state_dict = {k: v.detach().cpu() for k, v in state_dict.items()}
+        for conn in self.weight_conns:
+            conn.send((state_dict, epsilon))
+
+    def get(self, timeout=None):
+        """Next TransitionBatch from whichever worker is ready first"""
+        return self.batch_queue.get(timeout=timeout)
+
+    def batches(self):
+        while True:
+            yield self.get()
+
+    def close(self):
+        self.stop_event.set()
+        # Drain the queue so workers blocked on put() can exit
+        while any(p.is_alive() for p in self.processes):
+            try:
+                self.batch_queue.get(timeout=0.1)
+            except Empty:
+                pass
+        for process in self.processes:
+            process.join()
+        for conn in self.weight_conns:
+            conn.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()